@@ -1,4 +1,4 @@
-from fastapi import Depends, HTTPException, Header
+from fastapi import Depends, HTTPException, Header, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from app.core.config import settings
@@ -27,15 +27,20 @@ async def fetch_user_from_token(token: str) -> User:
         raise credentials_exception
 
     user_service = UserService()
-    user = user_service.get_user_by_username(username)
+    user = await user_service.get_principal(username)
     if not user:
         raise credentials_exception 
 
     return user
 
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme)
 ) -> User:
+    # RoleAccessMiddleware already resolved the user for this request
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
     return await fetch_user_from_token(token)
 
 async def get_super_admin_user(current_user: User = Depends(get_current_user)) -> User:
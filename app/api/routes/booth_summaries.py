@@ -1,34 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from typing import List
 from app.api.deps import get_current_user, get_voter_service
 from app.models.user import User
 from app.services.voter_service import VoterService
 from app.schemas.booth_summary_schema import BoothSummaryResponse
+from app.utils.helpers import etag_headers, etag_matches
 from app.utils.logger import logger
 
 router = APIRouter()
 
 @router.get("/", response_model=List[BoothSummaryResponse])
 async def get_booth_summaries(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     voter_service: VoterService = Depends(get_voter_service)
 ):
-    """Get booth summaries based on user access"""
+    """Get booth summaries based on user access; 304 while no summary has been rewritten"""
     try:
+        headers = etag_headers(voter_service.get_booth_summaries_etag(current_user["assigned_booths"]))
+        if etag_matches(request, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        response.headers.update(headers)
+
         summaries = voter_service.get_booth_summaries(current_user["assigned_booths"])
         return [summary.to_response_dict() for summary in summaries]
     except Exception as e:
         logger.error(f"Error fetching booth summaries: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch booth summaries")
 
-@router.post("/refresh")
+@router.post("/refresh", status_code=202)
 async def refresh_booth_summaries(
     current_user: User = Depends(get_current_user),
     voter_service: VoterService = Depends(get_voter_service)
 ):  
+    """Queue a background refresh of the user's booth summaries"""
     try:
-        voter_service.refresh_booth_summaries(current_user["assigned_booths"])
-        return {"message": "Booth summaries refreshed successfully"}
+        job = voter_service.refresh_booth_summaries(current_user["assigned_booths"], current_user["user_id"])
+        return {"message": "Booth summary refresh queued", **job}
     except Exception as e:
         logger.error(f"Error refreshing booth summaries: {e}")
-        raise HTTPException(status_code=500, detail="Failed to refresh booth summaries")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to refresh booth summaries")
+
+@router.get("/refresh/{job_id}")
+async def get_refresh_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    voter_service: VoterService = Depends(get_voter_service)
+):
+    """Get progress of a booth summary refresh job"""
+    if current_user["role"] in ["super_admin", "admin"]:
+        job = voter_service.get_refresh_job(job_id)
+    else:
+        # Coalesced jobs are shared, so every requester and anyone assigned to the job's booths may poll them
+        job = voter_service.get_refresh_job(job_id, current_user["user_id"], current_user["assigned_booths"])
+    if not job:
+        raise HTTPException(status_code=404, detail="Refresh job not found")
+    return job
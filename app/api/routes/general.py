@@ -1,55 +1,78 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request
 from typing import List, Optional
 from app.api.deps import get_current_user
 from app.models.user import User
-from app.data.postgres_adapter import PostgresAdapter
+from app.services.hierarchy_index import hierarchy_index
+from app.utils.helpers import etag_response
 
 router = APIRouter()
-adapter = PostgresAdapter()
+
+async def _hierarchy_response(request: Request, key, build):
+    body, etag = await hierarchy_index.get_response(key, build)
+    return etag_response(request, body, etag)
 
 @router.get("/states", response_model=List[dict])
 async def list_states(
+    request: Request
 ):
-    return adapter.get_states() 
+    return await _hierarchy_response(request, ("states",), hierarchy_index.list_states)
 
 
 @router.get("/districts", response_model=List[dict])
 async def list_districts(
+    request: Request,
     state_id: Optional[int] = Query(None, description="State ID to get districts for")  
 ):
 
-    return adapter.get_districts(state_id) 
+    return await _hierarchy_response(
+        request, ("districts", state_id), lambda: hierarchy_index.list_districts(state_id)
+    )
 
 
 @router.get("/constituencies", response_model=List[dict])
 async def list_constituencies(
+    request: Request,
     state_id: Optional[int] = Query(None, description="State ID to get constituencies for"),
     district_id: Optional[int] = Query(None, description="District ID to get constituencies for")
 ):
 
-    return adapter.get_constituencies(state_id, district_id)
+    return await _hierarchy_response(
+        request, ("constituencies", state_id, district_id),
+        lambda: hierarchy_index.list_constituencies(state_id, district_id)
+    )
 
 @router.get("/blocks", response_model=List[dict])
 async def list_blocks(
+    request: Request,
     constituency_id: Optional[int] = Query(None, description="Constituency ID to get blocks for")
 ):
-    return adapter.get_blocks(constituency_id)
+    return await _hierarchy_response(
+        request, ("blocks", constituency_id), lambda: hierarchy_index.list_blocks(constituency_id)
+    )
 
 @router.get("/panchayats", response_model=List[dict])
 async def list_panchayats(
+    request: Request,
     block_id: Optional[int] = Query(None, description="Block ID to get panchayats for")
 ):
-    return adapter.get_panchayats(block_id)
+    return await _hierarchy_response(
+        request, ("panchayats", block_id), lambda: hierarchy_index.list_panchayats(block_id)
+    )
 
 @router.get("/booths", response_model=List[dict])
 async def list_booths(
+    request: Request,
     constituency_id: Optional[int] = Query(None, description="Constituency ID to get booths for"),
     panchayat_id: Optional[int] = Query(None, description="Panchayat ID to get booths for")
 ):
-    return adapter.get_booths(constituency_id, panchayat_id)
+    return await _hierarchy_response(
+        request, ("booths", constituency_id, panchayat_id),
+        lambda: hierarchy_index.list_booths(constituency_id, panchayat_id)
+    )
 
 @router.get("/booths-by-blocks", response_model=List[dict])
 async def list_booths_by_blocks(
+    request: Request,
     block_ids: str = Query(..., description="Comma-separated block IDs (e.g., '1,2,3')")
 ):
     """Get all booths falling under the specified blocks"""
@@ -59,6 +82,20 @@ async def list_booths_by_blocks(
         if not block_id_list:
             raise HTTPException(status_code=400, detail="Invalid block_ids parameter")
         
-        return adapter.get_booths_by_blocks(block_id_list)
+        return await _hierarchy_response(
+            request, ("booths_by_blocks", tuple(sorted(set(block_id_list)))),
+            lambda: hierarchy_index.list_booths_by_blocks(block_id_list)
+        )
     except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid block_ids format. Use comma-separated integers.")
\ No newline at end of file
+        raise HTTPException(status_code=400, detail="Invalid block_ids format. Use comma-separated integers.")
+
+@router.post("/hierarchy/reload")
+async def reload_hierarchy(
+    user: User = Depends(get_current_user)
+):
+    """Reload the cached hierarchy after states/districts/constituencies/blocks/panchayats/booths change"""
+    if user['role'] not in ['super_admin', 'admin']:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    version = await hierarchy_index.reload()
+    return {"message": "Hierarchy reloaded", "version": version}
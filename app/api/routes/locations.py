@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, Query
 from fastapi.websockets import WebSocketDisconnect
 from typing import List
-from app.schemas.location_schema import LocationUpdate, UserLocationInfo, LocationHistoryResponse, CacheLocationResponse
+from app.schemas.location_schema import LocationUpdate, UserLocationInfo, NearbyUserLocationInfo, LocationHistoryResponse, CacheLocationResponse
 from app.services.location_service import LocationService
 from app.services.websocket_manager import websocket_manager
 from app.api.deps import get_current_user
@@ -57,6 +57,52 @@ async def get_subordinate_locations(
     
     return users_with_locations
 
+def _users_at_locations(location_service: LocationService, locations: dict, limit: int) -> List[dict]:
+    """User info for the first `limit` locations, keeping their order and any distance_km"""
+    user_ids = list(locations)[:limit]
+    if not user_ids:
+        return []
+    users = {u['user_id']: u for u in location_service.get_user_info_with_location(user_ids)}
+    return [
+        {**users[user_id], 'distance_km': locations[user_id].get('distance_km')}
+        for user_id in user_ids if user_id in users
+    ]
+
+@router.get("/locations/nearby", response_model=List[NearbyUserLocationInfo])
+async def get_nearby_locations(
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(5, gt=0, le=100, description="Search radius in kilometres"),
+    limit: int = Query(500, ge=1, le=5000),
+    user: User = Depends(get_current_user)
+):
+    """Get subordinates whose latest location is within radius_km of a point, nearest first"""
+    if user['role'] not in ['super_admin', 'admin']:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    location_service = LocationService()
+    locations = location_service.get_subordinate_locations_within(user, latitude, longitude, radius_km)
+    return _users_at_locations(location_service, locations, limit)
+
+@router.get("/locations/viewport", response_model=List[NearbyUserLocationInfo])
+async def get_viewport_locations(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    limit: int = Query(5000, ge=1, le=20000),
+    user: User = Depends(get_current_user)
+):
+    """Get subordinates whose latest location is inside a map viewport"""
+    if user['role'] not in ['super_admin', 'admin']:
+        raise HTTPException(status_code=403, detail="Access denied")
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="min_lat/min_lon must not exceed max_lat/max_lon")
+
+    location_service = LocationService()
+    locations = location_service.get_subordinate_locations_in_bbox(user, min_lat, min_lon, max_lat, max_lon)
+    return _users_at_locations(location_service, locations, limit)
+
 @router.get("/locations/{user_id}/history", response_model=LocationHistoryResponse)
 async def get_user_location_history(
     user_id: int,
@@ -116,7 +162,7 @@ async def websocket_locations(websocket: WebSocket):
                 message = await websocket.receive_text()
                 # Handle ping/pong or other control messages if needed
                 if message == "ping":
-                    await websocket.send_text("pong")
+                    websocket_manager.send_text(user['user_id'], "pong", websocket)
             except WebSocketDisconnect:
                 break
                 
@@ -127,4 +173,4 @@ async def websocket_locations(websocket: WebSocket):
     finally:
         # Clean up connection
         if user:
-            websocket_manager.disconnect(user['user_id'])
\ No newline at end of file
+            websocket_manager.disconnect(user['user_id'], websocket)
\ No newline at end of file
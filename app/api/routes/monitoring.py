@@ -1,6 +1,12 @@
 from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import PlainTextResponse
 from typing import List
 from app.services.api_monitoring_service import APIMonitoringService
+from app.services.api_log_writer import api_log_writer
+from app.services.location_history_writer import location_history_writer
+from app.services.metrics_registry import metrics_registry
+from app.services.voter_list_cache import voter_list_cache
+from app.services.websocket_manager import websocket_manager
 from app.api.deps import get_current_user
 from app.models.user import User
 
@@ -36,12 +42,45 @@ async def get_error_rates(
         "error_rates": error_rates
     }
 
+@router.get("/metrics")
+async def get_metrics(
+    window: str = Query("5m", pattern="^(1m|5m|15m|1h)$", description="Rolling window"),
+    user: User = Depends(get_current_user)
+):
+    """Get in-process latency percentiles and error rates by route"""
+    if user['role'] not in ['super_admin', 'admin']:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return {
+        "window": window,
+        "routes": metrics_registry.snapshot(window),
+        "voter_list_cache": voter_list_cache.get_stats(),
+        "location_history_writer": location_history_writer.get_stats()
+    }
+
+@router.get("/metrics/prometheus", response_class=PlainTextResponse)
+async def get_prometheus_metrics(
+    user: User = Depends(get_current_user)
+):
+    """Prometheus text exposition of request metrics"""
+    if user['role'] not in ['super_admin', 'admin']:
+        raise HTTPException(status_code=403, detail="Access denied")
+
+    return PlainTextResponse(
+        metrics_registry.render_prometheus() + voter_list_cache.render_prometheus() + location_history_writer.render_prometheus(),
+        media_type="text/plain; version=0.0.4"
+    )
+
 @router.get("/system-health")
 async def get_system_health():
     """Basic system health check"""
     return {
         "status": "healthy",
-        "timestamp": "2024-01-01T00:00:00Z"
+        "timestamp": "2024-01-01T00:00:00Z",
+        "api_log_writer": api_log_writer.get_stats(),
+        "location_history_writer": location_history_writer.get_stats(),
+        "voter_list_cache": voter_list_cache.get_stats(),
+        "location_websockets": websocket_manager.get_stats()
     }
 
 @router.post("/cleanup")
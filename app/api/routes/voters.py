@@ -1,25 +1,83 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from typing import List, Optional, Dict, Any
-from app.schemas.voter_schema import VoterResponse, VoterUpdate, VoterBulkUpdate, VoterBulkUpdateResponse
+from app.schemas.voter_schema import VoterResponse, VoterUpdate, VoterBulkUpdate, VoterBulkUpdateResponse, VoterSync, VoterSyncResponse
 from app.services.voter_service import VoterService
 from app.api.deps import get_current_user
 from app.models.user import User
+from app.core.config import settings
+from app.utils.helpers import dumps_json, etag_headers, etag_matches
 
 router = APIRouter()
 
+async def _voter_listing(voter_service, booth_ids, fields, cursor, limit, response_format):
+    """Serve the paginated / projected / streamed listing modes, or None for the legacy full list"""
+    field_list = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+
+    if not (field_list or cursor or limit or response_format):
+        return None
+
+    try:
+        if response_format == "ndjson":
+            return StreamingResponse(
+                voter_service.stream_voters_ndjson(booth_ids, field_list),
+                media_type="application/x-ndjson"
+            )
+
+        page = await voter_service.get_voters_page(booth_ids, field_list, cursor, limit or 500)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return Response(
+        content=dumps_json(page),
+        media_type="application/json"
+    )
+
+async def _full_voter_list(request, response, voter_service, booth_ids):
+    """Full list in the VoterResponse shape; trusted mode serves cached per-booth JSON instead of validating each voter.
+
+    The versions are read before the rows, so a list that changes mid-request is revalidated next time.
+    """
+    versions = await voter_service.get_voter_list_versions(booth_ids)
+    headers = etag_headers(voter_service.get_voters_etag(booth_ids, versions))
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    if settings.TRUSTED_VOTER_OUTPUT:
+        body = await voter_service.serialize_voters(booth_ids, versions)
+        return Response(content=body, media_type="application/json", headers=headers)
+    response.headers.update(headers)
+    return await voter_service.search_voters(booth_ids)
+
 @router.get("/", response_model=List[VoterResponse])
 async def list_voters(
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (booth_id, serial_no_in_list, epic_id are always included)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=2000, description="Page size; enables paginated response"),
+    response_format: Optional[str] = Query(None, alias="format", pattern="^(json|ndjson)$", description="ndjson streams all voters line by line"),
     user: User = Depends(get_current_user)
 ):
     if user['role'] != "booth_volunteer" :
         raise HTTPException(status_code=404, detail="User does not allowed to fetch voters")
     voter_service = VoterService()
-    voters = voter_service.search_voters(user["assigned_booths"])
-    return voters
+
+    listing = await _voter_listing(voter_service, user["assigned_booths"], fields, cursor, limit, response_format)
+    if listing is not None:
+        return listing
+
+    return await _full_voter_list(request, response, voter_service, user["assigned_booths"])
 
 @router.get("/booth/{booth_id}", response_model=List[VoterResponse])
 async def list_voters(
     booth_id: int,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (booth_id, serial_no_in_list, epic_id are always included)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=2000, description="Page size; enables paginated response"),
+    response_format: Optional[str] = Query(None, alias="format", pattern="^(json|ndjson)$", description="ndjson streams all voters line by line"),
     user: User = Depends(get_current_user)
 ):
     voter_service = VoterService()
@@ -27,16 +85,132 @@ async def list_voters(
     if int(booth_id) not in user['assigned_booths'] : 
         raise HTTPException(status_code=404, detail="User does not have access of this booth")
 
-    voters = voter_service.search_voters([booth_id])
-    return voters
+    listing = await _voter_listing(voter_service, [booth_id], fields, cursor, limit, response_format)
+    if listing is not None:
+        return listing
+
+    return await _full_voter_list(request, response, voter_service, [booth_id])
+
+
+# Matching strategies for GET /voters/search
+SEARCH_MODES = {
+    "all": ("prefix", "fuzzy", "phonetic"),
+    "prefix": ("prefix",),
+    "fuzzy": ("fuzzy",),
+    "phonetic": ("phonetic",),
+}
+
+@router.get("/search")
+async def search_voters(
+    q: str = Query(..., min_length=2, max_length=100, description="Name (English or Hindi), guardian name, house number or mobile"),
+    booth_id: Optional[int] = Query(None, description="Limit to one assigned booth"),
+    mode: str = Query("all", pattern="^(all|prefix|fuzzy|phonetic)$"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    user: User = Depends(get_current_user)
+):
+    """Search voters in the user's assigned booths, best matches first"""
+    voter_service = VoterService()
+
+    booth_ids = user['assigned_booths'] or []
+    if booth_id is not None:
+        if booth_id not in booth_ids:
+            raise HTTPException(status_code=404, detail="User does not have access of this booth")
+        booth_ids = [booth_id]
+
+    try:
+        results = await voter_service.find_voters(booth_ids, q, SEARCH_MODES[mode], limit, offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return Response(content=dumps_json(results), media_type="application/json")
+
+def _split_values(value: Optional[str]) -> List[str]:
+    return [v.strip() for v in value.split(',') if v.strip()] if value else []
+
+@router.get("/filter")
+async def filter_voters(
+    booth_ids: Optional[str] = Query(None, description="Comma-separated booth IDs (defaults to all assigned booths)"),
+    voting_preference: Optional[str] = Query(None, description="Comma-separated values; any of them matches"),
+    category: Optional[str] = Query(None, description="Comma-separated values, e.g. OBC,SC"),
+    caste: Optional[str] = Query(None),
+    religion: Optional[str] = Query(None),
+    gender: Optional[str] = Query(None),
+    age_band: Optional[str] = Query(None, description="Comma-separated bands: 18-35, 36-55, 56+"),
+    education_level: Optional[str] = Query(None),
+    employment_status: Optional[str] = Query(None),
+    migrated: Optional[bool] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (booth_id, serial_no_in_list, epic_id are always included)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(100, ge=1, le=2000),
+    user: User = Depends(get_current_user)
+):
+    """Filter voters by any combination of dimensions, with facet counts for drilling down"""
+    voter_service = VoterService()
+
+    try:
+        booth_id_list = [int(b) for b in _split_values(booth_ids)] or user['assigned_booths'] or []
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid booth_ids format. Use comma-separated integers.")
+
+    if set(booth_id_list) - set(user['assigned_booths'] or []):
+        raise HTTPException(status_code=404, detail="User does not have access of this booth")
+
+    filters = {
+        "voting_preference": _split_values(voting_preference),
+        "category": _split_values(category),
+        "caste": _split_values(caste),
+        "religion": _split_values(religion),
+        "gender": _split_values(gender),
+        "age_band": _split_values(age_band),
+        "education_level": _split_values(education_level),
+        "employment_status": _split_values(employment_status),
+        "migrated": [migrated] if migrated is not None else [],
+    }
+    field_list = _split_values(fields) or None
+
+    try:
+        results = await voter_service.filter_voters(booth_id_list, filters, field_list, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return Response(content=dumps_json(results), media_type="application/json")
+
+@router.get("/changes")
+async def list_voter_changes(
+    booth_ids: Optional[str] = Query(None, description="Comma-separated booth IDs (defaults to all assigned booths)"),
+    since: Optional[str] = Query(None, description="next_cursor from the previous call; omit for a full initial sync"),
+    limit: int = Query(500, ge=1, le=2000),
+    changed_only: bool = Query(False, description="Return only the columns changed since the cursor"),
+    user: User = Depends(get_current_user)
+):
+    """Get voters modified since a cursor, oldest change first"""
+    voter_service = VoterService()
+
+    try:
+        booth_id_list = [int(b.strip()) for b in booth_ids.split(',') if b.strip()] if booth_ids else user['assigned_booths']
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid booth_ids format. Use comma-separated integers.")
+
+    if set(booth_id_list) - set(user['assigned_booths'] or []):
+        raise HTTPException(status_code=404, detail="User does not have access of this booth")
+
+    try:
+        changes = await voter_service.get_voter_changes(booth_id_list, since, limit, changed_only)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+    return Response(
+        content=dumps_json(changes),
+        media_type="application/json"
+    )
 
 @router.get("/{epic_id}", response_model=VoterResponse)
 async def get_voter(
     epic_id: str
 ):
     voter_service = VoterService()
-    voter = voter_service.get_voter_by_epic(epic_id)
+    voter = await voter_service.get_voter_by_epic(epic_id)
     return voter
 
 
@@ -52,12 +226,37 @@ async def update_voter(
     if not changes:
         raise HTTPException(status_code=400, detail="No fields to update")
 
-    success = voter_service.update_voter(user, epic_id, changes)
+    success = await voter_service.update_voter(user, epic_id, changes)
     if not success:
         raise HTTPException(status_code=403, detail="Update failed or access denied")
 
     return {"message": f"Voter {epic_id} updated successfully", "updated_fields": changes}
 
+@router.post("/sync", response_model=VoterSyncResponse)
+async def sync_voters(
+    payload: VoterSync,
+    user: User = Depends(get_current_user)
+):
+    """Replay a batch of offline edits; edits to voters changed since base_updated_at come back as conflicts"""
+    voter_service = VoterService()
+    edits = [
+        {
+            'epic_id': edit.epic_id,
+            'changes': edit.changes.dict(exclude_unset=True),
+            'base_updated_at': edit.base_updated_at,
+            'client_timestamp': edit.client_timestamp
+        }
+        for edit in payload.edits
+    ]
+    empty_edits = [edit['epic_id'] for edit in edits if not edit['changes']]
+    if empty_edits:
+        raise HTTPException(status_code=400, detail=f"No fields to update for: {', '.join(empty_edits)}")
+
+    try:
+        return await voter_service.sync_voters(user, edits)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/bulk-update", response_model=VoterBulkUpdateResponse)
 async def bulk_update_voters(
     payload: VoterBulkUpdate,
@@ -70,7 +269,7 @@ async def bulk_update_voters(
         raise HTTPException(status_code=400, detail="No field updates provided")
     
     try:
-        result = voter_service.bulk_update_voters(
+        result = await voter_service.bulk_update_voters(
             user, 
             payload.field_updates, 
             payload.options.dict() if payload.options else None
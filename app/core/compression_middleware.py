@@ -0,0 +1,190 @@
+import zlib
+from typing import List, Optional
+import anyio
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.utils.helpers import encoded_etag
+
+# Preference order when the client accepts several codings with the same q-value
+SUPPORTED_ENCODINGS = ("br", "gzip")
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+GZIP_LEVEL = 6
+# Brotli's default (11) is far too slow for per-request compression
+BROTLI_QUALITY = 5
+
+# Bodies this large are compressed on a worker thread instead of the event loop
+THREAD_OFFLOAD_SIZE = 256 * 1024
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header, honouring q-values (q=0 refuses)"""
+    qualities = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            qualities[coding.strip()] = quality
+
+    best, best_quality = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+class StreamCompressor:
+    """Incremental br/gzip compressor; each chunk is flushed so streamed lines reach the client"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._gzip = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._gzip.compress(data) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._gzip.flush()
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+class CompressionMiddleware:
+    """Negotiated br/gzip compression for JSON and text responses above a size threshold"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = settings.COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""))
+        responder = CompressionResponder(self.app, encoding, self.minimum_size, request_headers.get("if-none-match", ""))
+        await responder(scope, receive, send)
+
+class CompressionResponder:
+    """Holds back the response start until the first body chunk shows whether to compress.
+
+    Responses with a Content-Length (including those re-chunked by BaseHTTPMiddleware)
+    are buffered and compressed whole; responses without one are compressed as they stream.
+    """
+
+    def __init__(self, app: ASGIApp, encoding: Optional[str], minimum_size: int, if_none_match: str = ""):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.if_none_match = if_none_match
+        self.send: Send = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.mode = "passthrough"
+        self.buffer: List[bytes] = []
+        self.compressor: Optional[StreamCompressor] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.initial_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if not self.started:
+            self.started = True
+            self.mode = self._choose_mode(message)
+            if self.mode != "buffer":
+                await self.send(self.initial_message)
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.mode == "buffer":
+            self.buffer.append(body)
+            if more_body:
+                return
+            body = b"".join(self.buffer)
+            if len(body) >= THREAD_OFFLOAD_SIZE:
+                message["body"] = await anyio.to_thread.run_sync(compress_body, body, self.encoding)
+            else:
+                message["body"] = compress_body(body, self.encoding)
+            MutableHeaders(raw=self.initial_message["headers"])["Content-Length"] = str(len(message["body"]))
+            await self.send(self.initial_message)
+        elif self.mode == "stream":
+            body = self.compressor.compress(body)
+            if not more_body:
+                body += self.compressor.finish()
+            message["body"] = body
+
+        await self.send(message)
+
+    def _choose_mode(self, message: Message) -> str:
+        headers = MutableHeaders(raw=self.initial_message["headers"])
+        if self.initial_message["status"] == 304:
+            self._tag_not_modified(headers)
+            return "passthrough"
+
+        content_type = headers.get("content-type", "")
+        if "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return "passthrough"
+
+        # The representation depends on Accept-Encoding even when sent uncompressed
+        headers.add_vary_header("Accept-Encoding")
+        if not self.encoding:
+            return "passthrough"
+
+        content_length = headers.get("content-length")
+        if content_length is None and not message.get("more_body", False):
+            content_length = len(message.get("body", b""))
+        if content_length is not None and int(content_length) < self.minimum_size:
+            return "passthrough"
+
+        headers["Content-Encoding"] = self.encoding
+        if "etag" in headers:
+            headers["ETag"] = encoded_etag(headers["etag"], self.encoding)
+
+        if content_length is not None:
+            return "buffer"
+
+        del headers["Content-Length"]
+        self.compressor = StreamCompressor(self.encoding)
+        return "stream"
+
+    def _tag_not_modified(self, headers: MutableHeaders):
+        """Give a 304 the same coded ETag the 200 carried, so clients keep matching their cached copy.
+
+        A 304 has no body to size up, so the negotiated coding is assumed unless the
+        client's If-None-Match names the uncoded tag (a body too small to compress).
+        """
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if not self.encoding or not etag:
+            return
+        candidates = [tag.strip().removeprefix("W/") for tag in self.if_none_match.split(",")]
+        if etag.removeprefix("W/") not in candidates:
+            headers["ETag"] = encoded_etag(etag, self.encoding)
@@ -4,6 +4,26 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "super-secret"
     EXCEL_DIR: str = "app/data/constituency_files"
     EXCEL_CACHE_TTL: int = 60  # seconds
+    PRINCIPAL_CACHE_TTL: int = 60  # seconds
+    PRINCIPAL_CACHE_MAX_SIZE: int = 5000
+    USER_HIERARCHY_REFRESH_SECONDS: int = 300  # full reload of the created_by tree, for edits made by other workers
+    BOOTH_SUMMARY_RECONCILE_HOURS: int = 6
+    SUMMARY_REFRESH_WORKERS: int = 4  # capped by the DB connection pool size
+    SUMMARY_REFRESH_JOB_RETENTION: int = 3600  # seconds finished jobs stay queryable
+    API_LOG_QUEUE_SIZE: int = 10000
+    API_LOG_BATCH_SIZE: int = 500
+    API_LOG_FLUSH_INTERVAL: float = 2.0  # seconds
+    LOCATION_HISTORY_QUEUE_SIZE: int = 50000
+    LOCATION_HISTORY_BATCH_SIZE: int = 1000
+    LOCATION_HISTORY_FLUSH_INTERVAL: float = 2.0  # seconds
+    HIERARCHY_POLL_SECONDS: int = 300  # 0 disables change detection
+    CHANGE_FEED_SETTLE_SECONDS: int = 5  # newer voter edits wait for the next poll
+    TRUSTED_VOTER_OUTPUT: bool = True  # encode voter lists from DB rows without VoterResponse validation
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller responses are sent uncompressed
+    VOTER_LIST_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # serialized per-booth voter lists
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 1000  # distinct queued messages before a consumer is dropped as too slow
+    WEBSOCKET_SEND_TIMEOUT: float = 10.0  # seconds a single WebSocket send may take
+    LOCATION_BROADCAST_TICK_SECONDS: float = 1.0  # one location_batch frame per supervisor per tick; 0 sends every ping
 
     SMTP_HOST: str = "localhost"
     SMTP_PORT: int = 587
@@ -43,5 +43,9 @@ class RoleAccessMiddleware(BaseHTTPMiddleware):
         if "*" not in allowed_paths and not any(request.url.path.startswith(p) for p in allowed_paths):
             return JSONResponse(status_code=403, content={"detail": "Role not allowed to access this endpoint"})
 
+        # Hand the resolved user to routes (get_current_user) and monitoring
+        request.state.user = user
+        request.state.user_id = user['user_id']
+
         response = await call_next(request)
         return response
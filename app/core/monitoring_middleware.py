@@ -1,7 +1,9 @@
+import ipaddress
 import time
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from app.services.api_monitoring_service import APIMonitoringService
+from app.services.metrics_registry import metrics_registry, UNMATCHED_ROUTE
 
 class APIMonitoringMiddleware(BaseHTTPMiddleware):
     def __init__(self, app):
@@ -13,7 +15,7 @@ class APIMonitoringMiddleware(BaseHTTPMiddleware):
         if request.url.path in ["/health", "/docs", "/redoc", "/openapi.json"]:
             return await call_next(request)
 
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Get user info if available
         user_id = None
@@ -27,13 +29,28 @@ class APIMonitoringMiddleware(BaseHTTPMiddleware):
         response = await call_next(request)
         
         # Calculate response time
-        response_time_ms = int((time.time() - start_time) * 1000)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        response_time_ms = int(elapsed_ms)
+
+        # Matched route template (e.g. /voters/{epic_id}) keeps metric labels bounded
+        route = request.scope.get("route")
+        metrics_registry.record(
+            request.method,
+            route.path if route else UNMATCHED_ROUTE,
+            response.status_code,
+            elapsed_ms
+        )
         
         # Get client info
         ip_address = request.client.host if request.client else None
+        try:
+            # api_logs.ip_address is INET; one bad value would fail a whole batch
+            ipaddress.ip_address(ip_address)
+        except ValueError:
+            ip_address = None
         user_agent = request.headers.get("user-agent", "")[:500]  # Limit length
         
-        # Log the request (non-blocking)
+        # Queue the request log (written in batches by api_log_writer)
         try:
             self.monitoring_service.log_api_request(
                 endpoint=request.url.path,
@@ -0,0 +1,75 @@
+import os
+from contextlib import asynccontextmanager
+import logging
+from dotenv import load_dotenv
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool
+
+load_dotenv(dotenv_path=".env.postgres")
+
+logger = logging.getLogger(__name__)
+
+class AsyncDatabaseManager:
+    _instance = None
+    _connection_pool = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AsyncDatabaseManager, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, 'initialized'):
+            self.initialized = True
+            self._setup_connection_pool()
+
+    def _setup_connection_pool(self):
+        # The pool is created closed; it is opened from the running event loop
+        conninfo = make_conninfo(
+            host=os.getenv("SUPABASE_DB_HOST"),
+            port=int(os.getenv("SUPABASE_DB_PORT", "5432")),
+            dbname=os.getenv("SUPABASE_DB_NAME", "postgres"),
+            user=os.getenv("SUPABASE_DB_USER"),
+            password=os.getenv("SUPABASE_DB_PASSWORD"),
+            sslmode=os.getenv("SUPABASE_DB_SSLMODE", "require"),
+            gssencmode="disable"
+        )
+        self._connection_pool = AsyncConnectionPool(
+            conninfo=conninfo,
+            min_size=1,
+            max_size=20,
+            open=False
+        )
+
+    async def open(self):
+        if self._connection_pool.closed:
+            await self._connection_pool.open()
+            logger.info("Async database connection pool opened successfully")
+
+    @asynccontextmanager
+    async def get_connection(self):
+        if self._connection_pool.closed:
+            await self.open()
+        try:
+            # The pool commits on clean exit and rolls back on error
+            async with self._connection_pool.connection() as conn:
+                yield conn
+        except Exception as e:
+            logger.error(f"Async database operation failed: {e}")
+            raise
+
+    async def close_all_connections(self):
+        if self._connection_pool and not self._connection_pool.closed:
+            await self._connection_pool.close()
+            logger.info("All async database connections closed")
+
+async_db_manager = AsyncDatabaseManager()
+
+def get_async_db_connection():
+    return async_db_manager.get_connection()
+
+async def open_async_db_connections():
+    await async_db_manager.open()
+
+async def close_async_db_connections():
+    await async_db_manager.close_all_connections()
@@ -0,0 +1,783 @@
+import json
+from app.data.async_connection import get_async_db_connection
+from app.data.postgres_adapter import PostgresAdapter, USER_BY_USERNAME_QUERY, BLOCKS_QUERY, PANCHAYATS_QUERY
+
+# Hierarchy tables in the display order used by the /general endpoints
+HIERARCHY_QUERIES = {
+    "states": "SELECT * FROM states ORDER BY state_name",
+    "districts": "SELECT * FROM district ORDER BY district_name",
+    "constituencies": "SELECT * FROM constituencies ORDER BY constituency_name",
+    "blocks": "SELECT block_id, block_name, constituency_id FROM blocks ORDER BY block_name",
+    "panchayats": "SELECT panchayat_id, panchayat_name, block_id FROM panchayats ORDER BY panchayat_name",
+    "booths": "SELECT * FROM booths ORDER BY booth_number"
+}
+
+HIERARCHY_FINGERPRINT_QUERY = """
+    SELECT md5(concat_ws('|',
+        (SELECT md5(string_agg(t::text, ',' ORDER BY state_id)) FROM states t),
+        (SELECT md5(string_agg(t::text, ',' ORDER BY district_id)) FROM district t),
+        (SELECT md5(string_agg(t::text, ',' ORDER BY constituency_id)) FROM constituencies t),
+        (SELECT md5(string_agg(t::text, ',' ORDER BY block_id)) FROM blocks t),
+        (SELECT md5(string_agg(t::text, ',' ORDER BY panchayat_id)) FROM panchayats t),
+        (SELECT md5(string_agg(t::text, ',' ORDER BY booth_id)) FROM booths t)
+    ))
+"""
+
+class AsyncPostgresAdapter:
+    """Non-blocking counterpart of PostgresAdapter for the request hot paths"""
+
+    VOTER_COLUMNS = PostgresAdapter.VOTER_COLUMNS
+    # Columns that may be requested through a fields= projection
+    VOTER_READ_COLUMNS = VOTER_COLUMNS | {'epic_id', 'booth_id', 'constituency_id', 'part_number', 'created_at', 'updated_at'}
+    # Keyset pagination order; serial_no_in_list is nullable so it is coalesced (see idx_voters_keyset)
+    VOTER_KEYSET_COLUMNS = ('booth_id', 'serial_no_in_list', 'epic_id')
+    VOTER_KEYSET_ORDER = "booth_id, COALESCE(serial_no_in_list, 0), epic_id"
+    # Search expressions; must match idx_voters_search_trgm / idx_voters_phonetic exactly
+    VOTER_SEARCH_DOCUMENT = (
+        "voter_search_document(voter_fname, voter_lname, voter_fname_hin, voter_lname_hin, "
+        "guardian_fname, guardian_lname, guardian_fname_hin, guardian_lname_hin, house_no, mobile)"
+    )
+    VOTER_PHONETIC_KEYS = "voter_phonetic_keys(voter_fname, voter_lname, guardian_fname, guardian_lname)"
+    VOTER_SEARCH_COLUMNS = (
+        'epic_id', 'booth_id', 'serial_no_in_list', 'voter_fname', 'voter_lname', 'voter_fname_hin',
+        'voter_lname_hin', 'relation', 'guardian_fname', 'guardian_lname', 'guardian_fname_hin',
+        'guardian_lname_hin', 'house_no', 'gender', 'age', 'mobile'
+    )
+    # Age bands for filtering and facets: (min age, max age or None)
+    VOTER_AGE_BANDS = {"18-35": (18, 35), "36-55": (36, 55), "56+": (56, None)}
+    # Facet dimensions: dimension -> (filtered column, facet value expression).
+    # Empty strings count as missing, as in the booth summaries
+    VOTER_FACETS = {
+        'voting_preference': ('voting_preference', "NULLIF(voting_preference, '')"),
+        'category': ('category', "NULLIF(category, '')"),
+        'caste': ('caste', "NULLIF(caste, '')"),
+        'religion': ('religion', "NULLIF(religion, '')"),
+        'gender': ('gender', "gender"),
+        'age_band': ('age', "CASE " + " ".join(
+            f"WHEN age >= {low} THEN '{band}'" if high is None else f"WHEN age BETWEEN {low} AND {high} THEN '{band}'"
+            for band, (low, high) in VOTER_AGE_BANDS.items()
+        ) + " END"),
+        'education_level': ('education_level', "NULLIF(education_level, '')"),
+        'employment_status': ('employment_status', "NULLIF(employment_status, '')"),
+        'migrated': ('migrated', "migrated"),
+    }
+
+    async def get_voters(self, booth_ids=None, constituency_id=None):
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+
+            query = "SELECT * FROM voters WHERE 1=1"
+            params = []
+
+            if booth_ids:
+                placeholders = ','.join(['%s'] * len(booth_ids))
+                query += f" AND booth_id IN ({placeholders})"
+                params.extend(booth_ids)
+
+            if constituency_id:
+                query += " AND constituency_id = %s"
+                params.append(constituency_id)
+
+            await cursor.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            rows = await cursor.fetchall()
+
+            return [dict(zip(columns, row)) for row in rows]
+
+    async def get_voter_rows(self, fields=None, booth_ids=None):
+        """Get voters as (columns, row tuples) without building a dict per row; fields=None selects every column"""
+        self.validate_voter_fields(fields)
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+
+            query = f"SELECT {', '.join(fields) if fields else '*'} FROM voters"
+            params = []
+
+            if booth_ids:
+                query += " WHERE booth_id = ANY(%s)"
+                params.append(list(booth_ids))
+
+            await cursor.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            return columns, await cursor.fetchall()
+
+    async def get_voter_list_versions(self, booth_ids):
+        """{booth_id: (count, max updated_at, updated_at checksum)} for booths that have voters.
+
+        The checksum catches a slow transaction committing an updated_at older
+        than the current max; it is text so no precision is lost. Read from
+        idx_voters_booth_updated alone.
+        """
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            query = """
+                SELECT booth_id, COUNT(*), MAX(updated_at), SUM(EXTRACT(EPOCH FROM updated_at))::text
+                FROM voters
+            """
+            params = []
+
+            # Same scope as get_voter_rows
+            if booth_ids:
+                query += " WHERE booth_id = ANY(%s)"
+                params.append(list(booth_ids))
+
+            await cursor.execute(query + " GROUP BY booth_id", params)
+            return {row[0]: tuple(row[1:]) for row in await cursor.fetchall()}
+
+    def validate_voter_fields(self, fields=None):
+        invalid_fields = set(fields or []) - self.VOTER_READ_COLUMNS
+        if invalid_fields:
+            raise ValueError(f"Unknown voter fields: {', '.join(sorted(invalid_fields))}")
+
+    def _voter_select_list(self, fields=None):
+        """Build the SELECT list for a projection, always including the keyset columns"""
+        if not fields:
+            return "*"
+
+        self.validate_voter_fields(fields)
+        columns = list(self.VOTER_KEYSET_COLUMNS)
+        columns.extend(f for f in dict.fromkeys(fields) if f not in self.VOTER_KEYSET_COLUMNS)
+        return ', '.join(columns)
+
+    async def get_voters_page(self, booth_ids, fields=None, after=None, limit=500):
+        """Get one keyset page of voters ordered by (booth_id, serial_no_in_list, epic_id)"""
+        select_list = self._voter_select_list(fields)
+
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+
+            query = f"SELECT {select_list} FROM voters WHERE booth_id = ANY(%s)"
+            params = [list(booth_ids)]
+
+            if after:
+                query += f" AND ({self.VOTER_KEYSET_ORDER}) > (%s, %s, %s)"
+                params.extend(after)
+
+            query += f" ORDER BY {self.VOTER_KEYSET_ORDER} LIMIT %s"
+            params.append(limit)
+
+            await cursor.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            rows = await cursor.fetchall()
+
+            return [dict(zip(columns, row)) for row in rows]
+
+    async def find_voters(self, booth_ids, term, modes, limit=20, offset=0):
+        """Rank voters in booth_ids matching term by word prefix, trigram similarity and/or phonetic key.
+
+        Prefix matches score 1 (0.9 past the first name), trigram matches their
+        word_similarity (at least the 0.6 threshold of <%) and phonetic-only matches
+        0.6; ties keep list order. Fetches one extra row to report has_more.
+        """
+        document = self.VOTER_SEARCH_DOCUMENT
+        like_term = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        params = {
+            'booth_ids': list(booth_ids),
+            'term': term,
+            'prefix': f"{like_term}%",
+            'word_prefix': f"% {like_term}%",
+            'limit': limit + 1,
+            'offset': offset
+        }
+
+        matches = []
+        if 'prefix' in modes:
+            # A hit on the first name outranks one on a later word
+            matches.append((
+                f"({document} LIKE %(prefix)s OR {document} LIKE %(word_prefix)s)",
+                f"CASE WHEN {document} LIKE %(prefix)s THEN 1.0 ELSE 0.9 END"
+            ))
+        if 'fuzzy' in modes:
+            matches.append((f"%(term)s::text <%% {document}", f"word_similarity(%(term)s::text, {document})"))
+        if 'phonetic' in modes:
+            matches.append((f"{self.VOTER_PHONETIC_KEYS} && voter_phonetic_keys(%(term)s)", "0.6"))
+
+        # Matches are listed best first, so the first condition that holds gives the score.
+        # Every row passed one of them, so the last (phonetic, the costliest) is never re-evaluated
+        score = matches[-1][1]
+        if len(matches) > 1:
+            whens = " ".join(f"WHEN {condition} THEN {value}" for condition, value in matches[:-1])
+            score = f"CASE {whens} ELSE {score} END"
+
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            await cursor.execute(
+                f"""
+                SELECT {', '.join(self.VOTER_SEARCH_COLUMNS)}, ({score})::float AS score
+                FROM voters
+                WHERE booth_id = ANY(%(booth_ids)s)
+                  AND ({' OR '.join(condition for condition, _ in matches)})
+                ORDER BY score DESC, {self.VOTER_KEYSET_ORDER}
+                LIMIT %(limit)s OFFSET %(offset)s
+                """,
+                params
+            )
+            columns = [desc[0] for desc in cursor.description]
+            rows = await cursor.fetchall()
+
+            return [dict(zip(columns, row)) for row in rows]
+
+    def _facet_predicate(self, dimension, param, values):
+        """SQL predicate on the raw column for one facet filter, so the booth composite indexes apply"""
+        if dimension == 'age_band':
+            ranges = []
+            for band in values:
+                low, high = self.VOTER_AGE_BANDS[band]
+                ranges.append(f"age >= {low}" if high is None else f"age BETWEEN {low} AND {high}")
+            return f"({' OR '.join(ranges)})"
+        return f"{self.VOTER_FACETS[dimension][0]} = ANY(%({param})s)"
+
+    async def filter_voters(self, booth_ids, filters, fields=None, after=None, limit=500):
+        """Keyset page of voters matching every filter, plus facet counts, in one round trip.
+
+        filters maps a VOTER_FACETS dimension to the accepted values (age_band takes
+        VOTER_AGE_BANDS keys). Each dimension's counts apply every filter except its own,
+        so a drill-down UI can show the alternatives. The facets come from one GROUPING
+        SETS pass over the rows failing at most one filter; both statements are pipelined.
+        """
+        select_list = self._voter_select_list(fields)
+        params = {'booth_ids': list(booth_ids), 'limit': limit}
+
+        predicates = {}
+        for position, (dimension, values) in enumerate(filters.items()):
+            param = f"filter_{position}"
+            if dimension != 'age_band':
+                params[param] = list(values)
+            predicates[dimension] = self._facet_predicate(dimension, param, values)
+
+        # Items: every predicate on the raw columns (idx_voters_booth_preference / idx_voters_booth_age_gender)
+        items_query = f"SELECT {select_list} FROM voters WHERE booth_id = ANY(%(booth_ids)s)"
+        for predicate in predicates.values():
+            items_query += f" AND {predicate}"
+        if after:
+            items_query += f" AND ({self.VOTER_KEYSET_ORDER}) > (%(after_booth)s, %(after_serial)s, %(after_epic)s)"
+            params.update(zip(('after_booth', 'after_serial', 'after_epic'), after))
+        items_query += f" ORDER BY {self.VOTER_KEYSET_ORDER} LIMIT %(limit)s"
+
+        # Facets: miss_<dimension> is 1 when the row fails that dimension's filter
+        dimensions = list(self.VOTER_FACETS)
+        misses = {dimension: f"miss_{dimension}" for dimension in predicates}
+        total_misses = " + ".join(misses.values()) or "0"
+        facet_query = f"""
+            SELECT
+                GROUPING({', '.join(dimensions)}) AS grouping_id,
+                {', '.join(dimensions)},
+                COUNT(*) FILTER (WHERE {total_misses} = 0) AS matching
+                {''.join(f", COUNT(*) FILTER (WHERE {total_misses} = {miss}) AS {miss}_count" for miss in misses.values())}
+            FROM (
+                SELECT
+                    {', '.join(f"{expression} AS {dimension}" for dimension, (_, expression) in self.VOTER_FACETS.items())}
+                    {''.join(f", (NOT COALESCE({predicates[dimension]}, false))::int AS {miss}" for dimension, miss in misses.items())}
+                FROM voters
+                WHERE booth_id = ANY(%(booth_ids)s)
+            ) v
+            WHERE {total_misses} <= 1
+            GROUP BY GROUPING SETS ((), {', '.join(f'({dimension})' for dimension in dimensions)})
+        """
+
+        async with get_async_db_connection() as conn:
+            items_cursor = conn.cursor()
+            facet_cursor = conn.cursor()
+            async with conn.pipeline():
+                await items_cursor.execute(items_query, params)
+                await facet_cursor.execute(facet_query, params)
+
+            columns = [desc[0] for desc in items_cursor.description]
+            items = [dict(zip(columns, row)) for row in await items_cursor.fetchall()]
+            facet_columns = [desc[0] for desc in facet_cursor.description]
+            facet_rows = [dict(zip(facet_columns, row)) for row in await facet_cursor.fetchall()]
+
+        # GROUPING() sets the bit of every dimension left out of the row's grouping set
+        all_bits = (1 << len(dimensions)) - 1
+        set_dimensions = {all_bits ^ (1 << (len(dimensions) - 1 - position)): dimension for position, dimension in enumerate(dimensions)}
+
+        total = 0
+        facets = {dimension: [] for dimension in dimensions}
+        for row in facet_rows:
+            if row['grouping_id'] == all_bits:
+                total = row['matching']
+                continue
+            dimension = set_dimensions[row['grouping_id']]
+            count = row[f"{misses[dimension]}_count"] if dimension in misses else row['matching']
+            if row[dimension] is not None and count:
+                facets[dimension].append({"value": row[dimension], "count": count})
+
+        for values in facets.values():
+            values.sort(key=lambda facet: (-facet["count"], str(facet["value"])))
+        return items, total, facets
+
+    async def get_voter_changes(self, booth_ids, after=None, limit=500, with_changed_fields=False, settle_seconds=0):
+        """Get voters modified after the (updated_at, epic_id) keyset, oldest change first.
+
+        Rows touched in the last settle_seconds are held back so that slower transactions
+        cannot commit behind a cursor already handed out. With with_changed_fields each row
+        gets the fields voter_updates recorded since the cursor (None when nothing was audited).
+        """
+        params = {'booth_ids': list(booth_ids), 'settle_seconds': settle_seconds, 'limit': limit}
+        changed_fields_select = ""
+        changed_fields_join = ""
+        keyset_filter = ""
+
+        if after:
+            params['after_updated_at'], params['after_epic_id'] = after
+            keyset_filter = "AND (v.updated_at, v.epic_id) > (%(after_updated_at)s, %(after_epic_id)s)"
+            if with_changed_fields:
+                changed_fields_select = ", cf.changed_fields"
+                changed_fields_join = """
+                LEFT JOIN LATERAL (
+                    SELECT array_agg(DISTINCT field) AS changed_fields
+                    FROM voter_updates u, jsonb_object_keys(u.new_values) AS field
+                    WHERE u.voter_epic_id = v.epic_id AND u.created_at > %(after_updated_at)s
+                ) cf ON true
+                """
+
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            # Served by idx_voters_booth_updated (booth_id, updated_at, epic_id)
+            await cursor.execute(
+                f"""
+                SELECT v.*{changed_fields_select}
+                FROM voters v
+                {changed_fields_join}
+                WHERE v.booth_id = ANY(%(booth_ids)s)
+                  AND v.updated_at <= LOCALTIMESTAMP - make_interval(secs => %(settle_seconds)s)
+                  {keyset_filter}
+                ORDER BY v.updated_at, v.epic_id
+                LIMIT %(limit)s
+                """,
+                params
+            )
+            columns = [desc[0] for desc in cursor.description]
+            rows = await cursor.fetchall()
+
+            return [dict(zip(columns, row)) for row in rows]
+
+    async def stream_voters(self, booth_ids, fields=None, batch_size=1000):
+        """Yield voters from a server-side cursor, holding at most batch_size rows in memory"""
+        select_list = self._voter_select_list(fields)
+
+        async with get_async_db_connection() as conn:
+            async with conn.cursor(name="voters_stream") as cursor:
+                cursor.itersize = batch_size
+                await cursor.execute(
+                    f"SELECT {select_list} FROM voters WHERE booth_id = ANY(%s) ORDER BY {self.VOTER_KEYSET_ORDER}",
+                    (list(booth_ids),)
+                )
+                columns = [desc[0] for desc in cursor.description]
+                async for row in cursor:
+                    yield dict(zip(columns, row))
+
+    async def get_voters_by_epic(self, epic_id=None):
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+
+            query = "SELECT * FROM voters WHERE 1=1"
+            params = []
+
+            if epic_id:
+                query += " AND epic_id = %s"
+                params.append(epic_id)
+
+            await cursor.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            rows = await cursor.fetchall()
+
+            return [dict(zip(columns, row)) for row in rows]
+
+    async def update_voter(self, epic_id, changes, user_id):
+        """Update a voter and audit the change in one statement.
+
+        Returns (old_row, new_row) dicts, or None when the voter does not exist.
+        """
+        invalid_fields = set(changes) - self.VOTER_COLUMNS
+        if invalid_fields:
+            raise ValueError(f"Fields not allowed for update: {', '.join(sorted(invalid_fields))}")
+
+        set_clause = ', '.join([f"{key} = %({key})s" for key in changes.keys()])
+        old_values = ', '.join([f"'{key}', old.{key}" for key in changes.keys()])
+
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            await cursor.execute(
+                f"""
+                WITH old AS (
+                    SELECT * FROM voters WHERE epic_id = %(epic_id)s FOR UPDATE
+                ),
+                updated AS (
+                    UPDATE voters v SET {set_clause}
+                    FROM old
+                    WHERE v.epic_id = old.epic_id
+                    RETURNING v.*
+                ),
+                audit AS (
+                    INSERT INTO voter_updates (voter_epic_id, user_id, old_values, new_values, created_at)
+                    SELECT old.epic_id, %(user_id)s, jsonb_build_object({old_values}), %(new_values)s::jsonb, CURRENT_TIMESTAMP
+                    FROM old
+                    JOIN updated ON updated.epic_id = old.epic_id
+                )
+                SELECT 'old' AS row_version, old.* FROM old
+                UNION ALL
+                SELECT 'new' AS row_version, updated.* FROM updated
+                """,
+                {
+                    **changes,
+                    'epic_id': epic_id,
+                    'user_id': user_id,
+                    'new_values': json.dumps(changes, default=str)
+                }
+            )
+            columns = [desc[0] for desc in cursor.description]
+            rows = {row[0]: dict(zip(columns[1:], row[1:])) for row in await cursor.fetchall()}
+            await conn.commit()
+
+            if 'old' not in rows:
+                return None
+            return rows['old'], rows['new']
+
+    async def bulk_update_voters(self, voter_updates, user_id):
+        """Apply {epic_id: {field: value}} in one UPDATE through a COPY-loaded staging table.
+
+        Each voter row is rewritten once however many fields change, and an audit
+        row per voter is written by the same statement. Returns updated counts per field.
+        """
+        fields = sorted({field for changes in voter_updates.values() for field in changes})
+        invalid_fields = set(fields) - self.VOTER_COLUMNS
+        if invalid_fields:
+            raise ValueError(f"Fields not allowed for update: {', '.join(sorted(invalid_fields))}")
+        if not fields:
+            return {}
+
+        column_list = ', '.join(fields)
+        set_clause = ',\n                '.join(
+            f"{field} = CASE WHEN '{field}' = ANY(s.fields) THEN s.{field} ELSE v.{field} END" for field in fields
+        )
+
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            # Staging columns copy the voters column types, so COPY parses values exactly as UPDATE would
+            await cursor.execute(
+                f"""
+                CREATE TEMP TABLE voter_update_staging ON COMMIT DROP AS
+                SELECT epic_id, {column_list}, NULL::text[] AS fields FROM voters WITH NO DATA
+                """
+            )
+            async with cursor.copy(f"COPY voter_update_staging (epic_id, {column_list}, fields) FROM STDIN") as copy:
+                for epic_id, changes in voter_updates.items():
+                    await copy.write_row(
+                        [epic_id] + [changes.get(field) for field in fields] + [list(changes)]
+                    )
+            await cursor.execute("ANALYZE voter_update_staging")
+
+            await cursor.execute(
+                f"""
+                WITH old AS (
+                    SELECT v.epic_id, to_jsonb(v) AS row_data
+                    FROM voters v
+                    JOIN voter_update_staging s ON s.epic_id = v.epic_id
+                    FOR UPDATE OF v
+                ),
+                updated AS (
+                    -- Joining old makes the lock and capture run before the rows change
+                    UPDATE voters v SET
+                    {set_clause},
+                    updated_at = CURRENT_TIMESTAMP
+                    FROM old
+                    JOIN voter_update_staging s ON s.epic_id = old.epic_id
+                    WHERE v.epic_id = old.epic_id
+                    RETURNING v.epic_id, s.fields, old.row_data AS old_data, to_jsonb(v) AS new_data
+                ),
+                audit AS (
+                    INSERT INTO voter_updates (voter_epic_id, user_id, old_values, new_values, created_at)
+                    SELECT
+                        epic_id,
+                        %s,
+                        (SELECT jsonb_object_agg(key, value) FROM jsonb_each(old_data) WHERE key = ANY(fields)),
+                        (SELECT jsonb_object_agg(key, value) FROM jsonb_each(new_data) WHERE key = ANY(fields)),
+                        CURRENT_TIMESTAMP
+                    FROM updated
+                )
+                SELECT field, COUNT(*)
+                FROM updated, unnest(updated.fields) AS field
+                GROUP BY field
+                """,
+                (user_id,)
+            )
+            updated_counts = {field: count for field, count in await cursor.fetchall()}
+
+            await conn.commit()
+            return updated_counts
+
+    async def sync_voters(self, edits, user_id, allowed_booth_ids=None):
+        """Apply offline edits in one transaction, rejecting any whose voter changed since base_updated_at.
+
+        edits are dicts with epic_id, changes and optional base_updated_at, applied in list order.
+        Returns (results, changed_fields_by_booth): one result per edit, and for applied
+        edits the set of fields changed in each booth.
+        """
+        fields = sorted({field for edit in edits for field in edit['changes']})
+        invalid_fields = set(fields) - self.VOTER_COLUMNS
+        if invalid_fields:
+            raise ValueError(f"Fields not allowed for update: {', '.join(sorted(invalid_fields))}")
+
+        epic_ids = sorted({edit['epic_id'] for edit in edits})
+        select_columns = ', '.join(['epic_id', 'booth_id', 'updated_at'] + fields)
+
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+
+            # Lock every voter in the batch up front, in a stable order
+            await cursor.execute(
+                f"SELECT {select_columns} FROM voters WHERE epic_id = ANY(%s) ORDER BY epic_id FOR UPDATE",
+                (epic_ids,)
+            )
+            columns = [desc[0] for desc in cursor.description]
+            current = {row[0]: dict(zip(columns, row)) for row in await cursor.fetchall()}
+
+            # Compared in SQL so a client's UTC offset is honoured; naive values are taken as DB-local time
+            conflicting = set()
+            based = [(i, edit) for i, edit in enumerate(edits) if edit.get('base_updated_at')]
+            if based:
+                await cursor.execute(
+                    """
+                    SELECT e.position
+                    FROM unnest(%(positions)s::int[], %(epic_ids)s::text[], %(bases)s::text[]) AS e(position, epic_id, base)
+                    JOIN voters v ON v.epic_id = e.epic_id
+                    WHERE v.updated_at > e.base::timestamptz
+                    """,
+                    {
+                        'positions': [i for i, _ in based],
+                        'epic_ids': [edit['epic_id'] for _, edit in based],
+                        'bases': [edit['base_updated_at'].isoformat() for _, edit in based]
+                    }
+                )
+                conflicting = {row[0] for row in await cursor.fetchall()}
+
+            results = []
+            merged_changes = {}
+            for position, edit in enumerate(edits):
+                epic_id = edit['epic_id']
+                row = current.get(epic_id)
+                if not row:
+                    results.append({'epic_id': epic_id, 'status': 'not_found'})
+                    continue
+                if allowed_booth_ids is not None and row['booth_id'] not in allowed_booth_ids:
+                    results.append({'epic_id': epic_id, 'status': 'forbidden'})
+                    continue
+
+                if position in conflicting:
+                    results.append({
+                        'epic_id': epic_id,
+                        'status': 'conflict',
+                        'updated_at': row['updated_at'],
+                        'server_values': {field: row[field] for field in edit['changes']}
+                    })
+                    continue
+
+                merged_changes.setdefault(epic_id, {}).update(edit['changes'])
+                results.append({'epic_id': epic_id, 'status': 'applied'})
+
+            if merged_changes:
+                # Voters editing the same fields share one pipelined statement
+                groups = {}
+                for epic_id, changes in merged_changes.items():
+                    groups.setdefault(tuple(sorted(changes)), []).append(epic_id)
+                for group_fields, group_epic_ids in groups.items():
+                    set_clause = ', '.join([f"{field} = %s" for field in group_fields])
+                    await cursor.executemany(
+                        f"UPDATE voters SET {set_clause} WHERE epic_id = %s",
+                        [[merged_changes[epic_id][field] for field in group_fields] + [epic_id] for epic_id in group_epic_ids]
+                    )
+
+                await self._log_updates(
+                    [
+                        (epic_id, user_id, {field: current[epic_id][field] for field in changes}, changes)
+                        for epic_id, changes in merged_changes.items()
+                    ],
+                    cursor
+                )
+
+                await cursor.execute(
+                    "SELECT epic_id, updated_at FROM voters WHERE epic_id = ANY(%s)", (list(merged_changes),)
+                )
+                updated_at = dict(await cursor.fetchall())
+                for result in results:
+                    if result['status'] == 'applied':
+                        result['updated_at'] = updated_at.get(result['epic_id'])
+
+            await conn.commit()
+
+        changed_fields_by_booth = {}
+        for epic_id, changes in merged_changes.items():
+            changed_fields_by_booth.setdefault(current[epic_id]['booth_id'], set()).update(changes)
+        return results, changed_fields_by_booth
+
+    async def get_affected_booth_ids(self, epic_ids):
+        """Get booth IDs for given voter epic IDs"""
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            await cursor.execute("SELECT DISTINCT booth_id FROM voters WHERE epic_id = ANY(%s)", (list(epic_ids),))
+            return [row[0] for row in await cursor.fetchall()]
+
+    async def get_user_by_username(self, username: str):
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            await cursor.execute(USER_BY_USERNAME_QUERY, (username,))
+            row = await cursor.fetchone()
+
+            if row:
+                columns = [desc[0] for desc in cursor.description]
+                return dict(zip(columns, row))
+            return None
+
+    async def get_states(self):
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            await cursor.execute("SELECT * FROM states ORDER BY state_name")
+            columns = [desc[0] for desc in cursor.description]
+            rows = await cursor.fetchall()
+            return [dict(zip(columns, row)) for row in rows]
+
+    async def get_districts(self, state_id=None):
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            query = "SELECT * FROM district WHERE 1=1"
+            params = []
+
+            if state_id:
+                query += " AND state_id = %s"
+                params.append(state_id)
+
+            query += " ORDER BY district_name"
+            await cursor.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            rows = await cursor.fetchall()
+            return [dict(zip(columns, row)) for row in rows]
+
+    async def get_constituencies(self, state_id=None, district_id=None):
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            query = "SELECT * FROM constituencies WHERE 1=1"
+            params = []
+
+            if state_id:
+                query += " AND state_id = %s"
+                params.append(state_id)
+
+            if district_id:
+                query += " AND district_id = %s"
+                params.append(district_id)
+
+            query += " ORDER BY constituency_name"
+            await cursor.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            rows = await cursor.fetchall()
+            return [dict(zip(columns, row)) for row in rows]
+
+    async def get_blocks(self, constituency_id=None):
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            query = BLOCKS_QUERY
+            params = []
+
+            if constituency_id:
+                query += " AND bl.constituency_id = %s"
+                params.append(constituency_id)
+
+            query += " GROUP BY bl.block_id, bl.block_name, bl.constituency_id ORDER BY bl.block_name"
+            await cursor.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            rows = await cursor.fetchall()
+            return [dict(zip(columns, row)) for row in rows]
+
+    async def get_panchayats(self, block_id=None):
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            query = PANCHAYATS_QUERY
+            params = []
+
+            if block_id:
+                query += " AND p.block_id = %s"
+                params.append(block_id)
+
+            query += " GROUP BY p.panchayat_id, p.panchayat_name, p.block_id ORDER BY p.panchayat_name"
+            await cursor.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            rows = await cursor.fetchall()
+            return [dict(zip(columns, row)) for row in rows]
+
+    async def get_booths(self, constituency_id=None, panchayat_id=None):
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            query = "SELECT booth_id, booth_number, booth_location FROM booths WHERE 1=1"
+            params = []
+
+            if constituency_id:
+                query += " AND constituency_id = %s"
+                params.append(constituency_id)
+
+            if panchayat_id:
+                query += " AND panchayat_id = %s"
+                params.append(panchayat_id)
+
+            query += " ORDER BY booth_number"
+            await cursor.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            rows = await cursor.fetchall()
+            return [dict(zip(columns, row)) for row in rows]
+
+    async def get_booths_by_blocks(self, block_ids):
+        """Get all booths falling under the specified blocks"""
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            await cursor.execute(
+                """
+                SELECT b.*, p.panchayat_name, bl.block_name, c.constituency_name
+                FROM booths b
+                JOIN panchayats p ON b.panchayat_id = p.panchayat_id
+                JOIN blocks bl ON p.block_id = bl.block_id
+                JOIN constituencies c ON b.constituency_id = c.constituency_id
+                WHERE bl.block_id = ANY(%s)
+                ORDER BY bl.block_name, p.panchayat_name, b.booth_number
+                """,
+                (block_ids,)
+            )
+            columns = [desc[0] for desc in cursor.description]
+            rows = await cursor.fetchall()
+            return [dict(zip(columns, row)) for row in rows]
+
+    async def get_hierarchy_snapshot(self):
+        """Load every hierarchy table on one connection"""
+        snapshot = {}
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            for table, query in HIERARCHY_QUERIES.items():
+                await cursor.execute(query)
+                columns = [desc[0] for desc in cursor.description]
+                rows = await cursor.fetchall()
+                snapshot[table] = [dict(zip(columns, row)) for row in rows]
+            await cursor.execute(HIERARCHY_FINGERPRINT_QUERY)
+            snapshot["fingerprint"] = (await cursor.fetchone())[0]
+        return snapshot
+
+    async def get_hierarchy_fingerprint(self):
+        """Checksum of the hierarchy tables, used to detect changes"""
+        async with get_async_db_connection() as conn:
+            cursor = conn.cursor()
+            await cursor.execute(HIERARCHY_FINGERPRINT_QUERY)
+            return (await cursor.fetchone())[0]
+
+    async def _log_update(self, epic_id, user_id, old_values, new_values, cursor):
+        await self._log_updates([(epic_id, user_id, old_values, new_values)], cursor)
+
+    async def _log_updates(self, entries, cursor):
+        """Write (epic_id, user_id, old_values, new_values) audit rows in one pipelined batch.
+
+        created_at is the transaction timestamp, the same clock the voters.updated_at trigger uses.
+        """
+        await cursor.executemany(
+            "INSERT INTO voter_updates (voter_epic_id, user_id, old_values, new_values, created_at) VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)",
+            [
+                (epic_id, user_id, json.dumps(old_values, default=str), json.dumps(new_values, default=str))
+                for epic_id, user_id, old_values, new_values in entries
+            ]
+        )
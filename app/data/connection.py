@@ -9,6 +9,8 @@ load_dotenv(dotenv_path=".env.postgres")
 
 logger = logging.getLogger(__name__)
 
+POOL_MAX_CONNECTIONS = 20
+
 class DatabaseManager:
     _instance = None
     _connection_pool = None
@@ -58,7 +60,7 @@ class DatabaseManager:
 
             self._connection_pool = pool.ThreadedConnectionPool(
                 minconn=1,
-                maxconn=20,
+                maxconn=POOL_MAX_CONNECTIONS,
                 host=os.getenv("SUPABASE_DB_HOST"),
                 port=int(os.getenv("SUPABASE_DB_PORT", "5432")),
                 database=os.getenv("SUPABASE_DB_NAME", "postgres"),
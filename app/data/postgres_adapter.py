@@ -4,6 +4,94 @@ from typing import List, Dict, Optional
 from app.data.connection import get_db_connection
 from app.utils.logger import logger
 
+# Queries shared with AsyncPostgresAdapter
+USERS_WITH_ASSIGNMENTS_QUERY = """
+    SELECT 
+        u.*, p.party_name, a.alliance_name,
+        COALESCE(array_agg(DISTINCT ub.booth_id) FILTER (WHERE ub.booth_id IS NOT NULL), '{}') as assigned_booths,
+        COALESCE(array_agg(DISTINCT uc.constituency_id) FILTER (WHERE uc.constituency_id IS NOT NULL), '{}') as assigned_constituencies,
+        COALESCE(array_agg(DISTINCT ubl.block_id) FILTER (WHERE ubl.block_id IS NOT NULL), '{}') as assigned_blocks,
+        COALESCE(array_agg(DISTINCT up.panchayat_id) FILTER (WHERE up.panchayat_id IS NOT NULL), '{}') as assigned_panchayats
+    FROM users u 
+    LEFT JOIN parties p ON u.party_id = p.party_id 
+    LEFT JOIN alliances a ON u.alliance_id = a.alliance_id
+    LEFT JOIN user_booths ub ON u.user_id = ub.user_id
+    LEFT JOIN user_constituencies uc ON u.user_id = uc.user_id
+    LEFT JOIN user_blocks ubl ON u.user_id = ubl.user_id
+    LEFT JOIN user_panchayats up ON u.user_id = up.user_id
+"""
+
+USER_BY_USERNAME_QUERY = USERS_WITH_ASSIGNMENTS_QUERY + """
+    WHERE u.username = %s
+    GROUP BY u.user_id, p.party_name, a.alliance_name
+"""
+
+BLOCKS_QUERY = """
+    SELECT 
+        bl.block_id,
+        bl.block_name,
+        bl.constituency_id,
+        COALESCE(
+            JSON_AGG(
+                JSON_BUILD_OBJECT(
+                    'panchayat_id', p.panchayat_id,
+                    'panchayat_name', p.panchayat_name,
+                    'booths', p.booths
+                ) ORDER BY p.panchayat_name
+            ) FILTER (WHERE p.panchayat_id IS NOT NULL), 
+            '[]'::json
+        ) as panchayats
+    FROM blocks bl
+    LEFT JOIN (
+        SELECT 
+            p.panchayat_id,
+            p.panchayat_name,
+            p.block_id,
+            COALESCE(
+                JSON_AGG(
+                    JSON_BUILD_OBJECT(
+                        'booth_id', b.booth_id,
+                        'booth_number', b.booth_number,
+                        'booth_location', b.booth_location
+                    ) ORDER BY b.booth_number
+                ) FILTER (WHERE b.booth_id IS NOT NULL),
+                '[]'::json
+            ) as booths
+        FROM panchayats p
+        LEFT JOIN booths b ON p.panchayat_id = b.panchayat_id
+        GROUP BY p.panchayat_id, p.panchayat_name, p.block_id
+    ) p ON bl.block_id = p.block_id
+    WHERE 1=1
+"""
+
+PANCHAYATS_QUERY = """
+    SELECT 
+        p.panchayat_id,
+        p.panchayat_name,
+        p.block_id,
+        COALESCE(
+            JSON_AGG(
+                JSON_BUILD_OBJECT(
+                    'booth_id', b.booth_id,
+                    'booth_number', b.booth_number,
+                    'booth_location', b.booth_location
+                ) ORDER BY b.booth_number
+            ) FILTER (WHERE b.booth_id IS NOT NULL),
+            '[]'::json
+        ) as booths
+    FROM panchayats p
+    LEFT JOIN booths b ON p.panchayat_id = b.panchayat_id
+    WHERE 1=1
+"""
+
+# Assignment field on a user → (table, id column)
+USER_ASSIGNMENT_TABLES = {
+    'assigned_booths': ('user_booths', 'booth_id'),
+    'assigned_constituencies': ('user_constituencies', 'constituency_id'),
+    'assigned_blocks': ('user_blocks', 'block_id'),
+    'assigned_panchayats': ('user_panchayats', 'panchayat_id')
+}
+
 class PostgresAdapter:
     # Voter table columns (excluding epic_id which cannot be updated)
     VOTER_COLUMNS = {
@@ -103,21 +191,7 @@ class PostgresAdapter:
         with get_db_connection() as conn:
             cursor = conn.cursor()
             
-            base_query = """
-                SELECT 
-                    u.*, p.party_name, a.alliance_name,
-                    COALESCE(array_agg(DISTINCT ub.booth_id) FILTER (WHERE ub.booth_id IS NOT NULL), '{}') as assigned_booths,
-                    COALESCE(array_agg(DISTINCT uc.constituency_id) FILTER (WHERE uc.constituency_id IS NOT NULL), '{}') as assigned_constituencies,
-                    COALESCE(array_agg(DISTINCT ubl.block_id) FILTER (WHERE ubl.block_id IS NOT NULL), '{}') as assigned_blocks,
-                    COALESCE(array_agg(DISTINCT up.panchayat_id) FILTER (WHERE up.panchayat_id IS NOT NULL), '{}') as assigned_panchayats
-                FROM users u 
-                LEFT JOIN parties p ON u.party_id = p.party_id 
-                LEFT JOIN alliances a ON u.alliance_id = a.alliance_id
-                LEFT JOIN user_booths ub ON u.user_id = ub.user_id
-                LEFT JOIN user_constituencies uc ON u.user_id = uc.user_id
-                LEFT JOIN user_blocks ubl ON u.user_id = ubl.user_id
-                LEFT JOIN user_panchayats up ON u.user_id = up.user_id
-            """
+            base_query = USERS_WITH_ASSIGNMENTS_QUERY
             
             params = []
             where_conditions = []
@@ -146,29 +220,24 @@ class PostgresAdapter:
             
             return [dict(zip(columns, row)) for row in rows]
         
-    def get_user_by_username(self, username: str):
+    def get_users_by_ids(self, user_ids):
         with get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
-                """
-                SELECT 
-                    u.*, p.party_name, a.alliance_name,
-                    COALESCE(array_agg(DISTINCT ub.booth_id) FILTER (WHERE ub.booth_id IS NOT NULL), '{}') as assigned_booths,
-                    COALESCE(array_agg(DISTINCT uc.constituency_id) FILTER (WHERE uc.constituency_id IS NOT NULL), '{}') as assigned_constituencies,
-                    COALESCE(array_agg(DISTINCT ubl.block_id) FILTER (WHERE ubl.block_id IS NOT NULL), '{}') as assigned_blocks,
-                    COALESCE(array_agg(DISTINCT up.panchayat_id) FILTER (WHERE up.panchayat_id IS NOT NULL), '{}') as assigned_panchayats
-                FROM users u 
-                LEFT JOIN parties p ON u.party_id = p.party_id 
-                LEFT JOIN alliances a ON u.alliance_id = a.alliance_id
-                LEFT JOIN user_booths ub ON u.user_id = ub.user_id
-                LEFT JOIN user_constituencies uc ON u.user_id = uc.user_id
-                LEFT JOIN user_blocks ubl ON u.user_id = ubl.user_id
-                LEFT JOIN user_panchayats up ON u.user_id = up.user_id
-                WHERE u.username = %s
+                USERS_WITH_ASSIGNMENTS_QUERY + """
+                WHERE u.user_id = ANY(%s)
                 GROUP BY u.user_id, p.party_name, a.alliance_name
-                """, 
-                (username,)
+                ORDER BY u.user_id
+                """,
+                (list(user_ids),)
             )
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def get_user_by_username(self, username: str):
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(USER_BY_USERNAME_QUERY, (username,))
             row = cursor.fetchone()
 
             if row:
@@ -183,66 +252,29 @@ class PostgresAdapter:
             cursor = conn.cursor()
             
             # Insert user
-            print(f"🔧 DB: Inserting user {username} with party_id={party_id}, alliance_id={alliance_id}")
+            logger.debug(f"Inserting user {username} with party_id={party_id}, alliance_id={alliance_id}")
             cursor.execute(
                 "INSERT INTO users (username, role, full_name, phone, password_hash, email, created_by, district_id, state_id, party_id, alliance_id) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING user_id",
                 (username, role, full_name, phone, password_hash, email, created_by, district_id, state_id, party_id, alliance_id)
             )
             user_id = cursor.fetchone()[0]
-            print(f"✅ DB: User created with ID: {user_id}")
-            
-            # Insert booth assignments
-            if assigned_booths:
-                if isinstance(assigned_booths, str):
-                    booth_ids = [int(b.strip()) for b in assigned_booths.split(',') if b.strip()]
-                else:
-                    booth_ids = assigned_booths
-                print(f"🏢 DB: Assigning {len(booth_ids)} booths to user {user_id}")
-                for booth_id in booth_ids:
-                    cursor.execute(
-                        "INSERT INTO user_booths (user_id, booth_id) VALUES (%s, %s)",
-                        (user_id, booth_id)
-                    )
-            
-            # Insert constituency assignments
-            if assigned_constituencies:
-                if isinstance(assigned_constituencies, str):
-                    const_ids = [int(c.strip()) for c in assigned_constituencies.split(',') if c.strip()]
-                else:
-                    const_ids = assigned_constituencies
-                print(f"🗳️ DB: Assigning {len(const_ids)} constituencies to user {user_id}")
-                for const_id in const_ids:
-                    cursor.execute(
-                        "INSERT INTO user_constituencies (user_id, constituency_id) VALUES (%s, %s)",
-                        (user_id, const_id)
-                    )
-            
-            # Insert block assignments
-            if assigned_blocks:
-                if isinstance(assigned_blocks, str):
-                    block_ids = [int(b.strip()) for b in assigned_blocks.split(',') if b.strip()]
-                else:
-                    block_ids = assigned_blocks
-                for block_id in block_ids:
-                    cursor.execute(
-                        "INSERT INTO user_blocks (user_id, block_id) VALUES (%s, %s)",
-                        (user_id, block_id)
-                    )
-            
-            # Insert panchayat assignments
-            if assigned_panchayats:
-                if isinstance(assigned_panchayats, str):
-                    panchayat_ids = [int(p.strip()) for p in assigned_panchayats.split(',') if p.strip()]
-                else:
-                    panchayat_ids = assigned_panchayats
-                for panchayat_id in panchayat_ids:
-                    cursor.execute(
-                        "INSERT INTO user_panchayats (user_id, panchayat_id) VALUES (%s, %s)",
-                        (user_id, panchayat_id)
-                    )
+            logger.debug(f"User created with ID: {user_id}")
+            
+            # Insert booth, constituency, block and panchayat assignments
+            assignments = {
+                'assigned_booths': assigned_booths,
+                'assigned_constituencies': assigned_constituencies,
+                'assigned_blocks': assigned_blocks,
+                'assigned_panchayats': assigned_panchayats
+            }
+            for field, ids in assignments.items():
+                if ids:
+                    ids = self._parse_assignment_ids(ids)
+                    logger.debug(f"Assigning {len(ids)} {field.replace('assigned_', '')} to user {user_id}")
+                    self._sync_assignments(cursor, user_id, field, ids)
             
             conn.commit()
-            print(f"✅ DB: Transaction committed for user {user_id}")
+            logger.debug(f"Transaction committed for user {user_id}")
             return self.get_user_by_id(user_id)
     
     def update_user(self, user_id, updates):
@@ -250,10 +282,7 @@ class PostgresAdapter:
             cursor = conn.cursor()
             
             # Handle booth, constituency, block, and panchayat updates separately
-            booth_updates = updates.pop('assigned_booths', None)
-            const_updates = updates.pop('assigned_constituencies', None)
-            block_updates = updates.pop('assigned_blocks', None)
-            panchayat_updates = updates.pop('assigned_panchayats', None)
+            assignment_updates = {field: updates.pop(field, None) for field in USER_ASSIGNMENT_TABLES}
             # Update main user fields
             if updates:
                 set_clauses = []
@@ -266,64 +295,39 @@ class PostgresAdapter:
                 values.append(user_id)
                 cursor.execute(f"UPDATE users SET {', '.join(set_clauses)} WHERE user_id = %s", values)
             
-            # Update booth assignments
-            if booth_updates is not None:
-                cursor.execute("DELETE FROM user_booths WHERE user_id = %s", (user_id,))
-                if booth_updates:
-                    if isinstance(booth_updates, str):
-                        booth_ids = [int(b.strip()) for b in booth_updates.split(',') if b.strip()]
-                    else:
-                        booth_ids = booth_updates
-                    for booth_id in booth_ids:
-                        cursor.execute(
-                            "INSERT INTO user_booths (user_id, booth_id) VALUES (%s, %s)",
-                            (user_id, booth_id)
-                        )
-            
-            # Update constituency assignments
-            if const_updates is not None:
-                cursor.execute("DELETE FROM user_constituencies WHERE user_id = %s", (user_id,))
-                if const_updates:
-                    if isinstance(const_updates, str):
-                        const_ids = [int(c.strip()) for c in const_updates.split(',') if c.strip()]
-                    else:
-                        const_ids = const_updates
-                    for const_id in const_ids:
-                        cursor.execute(
-                            "INSERT INTO user_constituencies (user_id, constituency_id) VALUES (%s, %s)",
-                            (user_id, const_id)
-                        )
-            
-            # Update block assignments
-            if block_updates is not None:
-                cursor.execute("DELETE FROM user_blocks WHERE user_id = %s", (user_id,))
-                if block_updates:
-                    if isinstance(block_updates, str):
-                        block_ids = [int(b.strip()) for b in block_updates.split(',') if b.strip()]
-                    else:
-                        block_ids = block_updates
-                    for block_id in block_ids:
-                        cursor.execute(
-                            "INSERT INTO user_blocks (user_id, block_id) VALUES (%s, %s)",
-                            (user_id, block_id)
-                        )
-            
-            # Update panchayat assignments
-            if panchayat_updates is not None:
-                cursor.execute("DELETE FROM user_panchayats WHERE user_id = %s", (user_id,))
-                if panchayat_updates:
-                    if isinstance(panchayat_updates, str):
-                        panchayat_ids = [int(p.strip()) for p in panchayat_updates.split(',') if p.strip()]
-                    else:
-                        panchayat_ids = panchayat_updates
-                    for panchayat_id in panchayat_ids:
-                        cursor.execute(
-                            "INSERT INTO user_panchayats (user_id, panchayat_id) VALUES (%s, %s)",
-                            (user_id, panchayat_id)
-                        )
+            # Update assignments, touching only rows that change
+            for field, ids in assignment_updates.items():
+                if ids is not None:
+                    self._sync_assignments(cursor, user_id, field, self._parse_assignment_ids(ids))
             
             conn.commit()
             return True
+
+    def _parse_assignment_ids(self, ids):
+        """Accept comma-separated strings or lists; drop duplicates keeping order"""
+        if isinstance(ids, str):
+            ids = [int(i.strip()) for i in ids.split(',') if i.strip()]
+        return list(dict.fromkeys(ids or []))
+
+    def _sync_assignments(self, cursor, user_id, field, ids):
+        """Make the user's rows in an assignment table exactly ids with one set-based statement"""
+        table, column = USER_ASSIGNMENT_TABLES[field]
+        cursor.execute(
+            f"""
+            WITH removed AS (
+                DELETE FROM {table}
+                WHERE user_id = %(user_id)s AND NOT ({column} = ANY(%(ids)s::int[]))
+            )
+            INSERT INTO {table} (user_id, {column})
+            SELECT %(user_id)s, target.id
+            FROM unnest(%(ids)s::int[]) AS target(id)
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {table} existing
+                WHERE existing.user_id = %(user_id)s AND existing.{column} = target.id
+            )
+            """,
+            {'user_id': user_id, 'ids': list(ids)}
+        )
     
     def delete_user(self, user_id):
         with get_db_connection() as conn:
@@ -418,43 +422,7 @@ class PostgresAdapter:
     def get_blocks(self, constituency_id=None):
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            query = """
-            SELECT 
-                bl.block_id,
-                bl.block_name,
-                bl.constituency_id,
-                COALESCE(
-                    JSON_AGG(
-                        JSON_BUILD_OBJECT(
-                            'panchayat_id', p.panchayat_id,
-                            'panchayat_name', p.panchayat_name,
-                            'booths', p.booths
-                        ) ORDER BY p.panchayat_name
-                    ) FILTER (WHERE p.panchayat_id IS NOT NULL), 
-                    '[]'::json
-                ) as panchayats
-            FROM blocks bl
-            LEFT JOIN (
-                SELECT 
-                    p.panchayat_id,
-                    p.panchayat_name,
-                    p.block_id,
-                    COALESCE(
-                        JSON_AGG(
-                            JSON_BUILD_OBJECT(
-                                'booth_id', b.booth_id,
-                                'booth_number', b.booth_number,
-                                'booth_location', b.booth_location
-                            ) ORDER BY b.booth_number
-                        ) FILTER (WHERE b.booth_id IS NOT NULL),
-                        '[]'::json
-                    ) as booths
-                FROM panchayats p
-                LEFT JOIN booths b ON p.panchayat_id = b.panchayat_id
-                GROUP BY p.panchayat_id, p.panchayat_name, p.block_id
-            ) p ON bl.block_id = p.block_id
-            WHERE 1=1
-            """
+            query = BLOCKS_QUERY
             params = []
             
             if constituency_id:
@@ -470,25 +438,7 @@ class PostgresAdapter:
     def get_panchayats(self, block_id=None):
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            query = """
-            SELECT 
-                p.panchayat_id,
-                p.panchayat_name,
-                p.block_id,
-                COALESCE(
-                    JSON_AGG(
-                        JSON_BUILD_OBJECT(
-                            'booth_id', b.booth_id,
-                            'booth_number', b.booth_number,
-                            'booth_location', b.booth_location
-                        ) ORDER BY b.booth_number
-                    ) FILTER (WHERE b.booth_id IS NOT NULL),
-                    '[]'::json
-                ) as booths
-            FROM panchayats p
-            LEFT JOIN booths b ON p.panchayat_id = b.panchayat_id
-            WHERE 1=1
-            """
+            query = PANCHAYATS_QUERY
             params = []
             
             if block_id:
@@ -859,47 +809,6 @@ class PostgresAdapter:
             rows = cursor.fetchall()
             return [dict(zip(columns, row)) for row in rows]
 
-    def bulk_update_voters_by_field(self, field, updates, user_id, batch_size=1000):
-        """Bulk update voters by field with batching for performance"""
-        # Validate field
-        if field not in self.VOTER_COLUMNS:
-            raise ValueError(f"Field '{field}' is not allowed for update")
-        
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            epic_ids = list(updates.keys())
-            total_updated = 0
-            
-            # Process in batches
-            for i in range(0, len(epic_ids), batch_size):
-                batch_ids = epic_ids[i:i + batch_size]
-                batch_updates = {eid: updates[eid] for eid in batch_ids}
-                
-                # Build CASE-WHEN query
-                cases = []
-                params = []
-                for epic_id, value in batch_updates.items():
-                    cases.append("WHEN epic_id = %s THEN %s")
-                    params.extend([epic_id, value])
-                
-                # Add epic_ids for WHERE clause
-                params.extend(batch_ids)
-                placeholders = ','.join(['%s'] * len(batch_ids))
-                
-                query = f"""
-                UPDATE voters 
-                SET {field} = CASE {' '.join(cases)} END,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE epic_id IN ({placeholders})
-                """
-                
-                cursor.execute(query, params)
-                batch_updated = cursor.rowcount
-                total_updated += batch_updated
-            
-            conn.commit()
-            return total_updated
-
     def get_affected_booth_ids(self, epic_ids):
         """Get booth IDs for given voter epic IDs"""
         with get_db_connection() as conn:
@@ -912,6 +821,6 @@ class PostgresAdapter:
 
     def _log_update(self, epic_id, user_id, old_values, new_values, cursor):
         cursor.execute(
-            "INSERT INTO voter_updates (voter_epic_id, user_id, old_values, new_values, created_at) VALUES (%s, %s, %s, %s, %s)",
-            (epic_id, user_id, json.dumps(old_values), json.dumps(new_values), datetime.now())
+            "INSERT INTO voter_updates (voter_epic_id, user_id, old_values, new_values, created_at) VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)",
+            (epic_id, user_id, json.dumps(old_values), json.dumps(new_values))
         )
\ No newline at end of file
@@ -1,10 +1,13 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import voters, users, auth, general, booth_summaries, schemes, parties, monitoring, locations
 from app.core.middleware import RoleAccessMiddleware
 from app.core.monitoring_middleware import APIMonitoringMiddleware
+from app.core.compression_middleware import CompressionMiddleware
 from app.core.exceptions import global_exception_handler
 from app.data.connection import close_db_connections
+from app.data.async_connection import open_async_db_connections, close_async_db_connections
 
 app = FastAPI(title="Voter Management System")
 
@@ -24,6 +27,8 @@ app.add_middleware(
 
 app.add_middleware(APIMonitoringMiddleware)
 app.add_middleware(RoleAccessMiddleware)
+# Outermost, so every response (including errors) is negotiated once
+app.add_middleware(CompressionMiddleware)
 
 # Add global exception handler
 app.add_exception_handler(Exception, global_exception_handler)
@@ -46,10 +51,31 @@ def root():
 @app.on_event("startup")
 async def startup_event():
     from app.services.cleanup_scheduler import cleanup_scheduler
+    from app.services.api_log_writer import api_log_writer
+    from app.services.location_history_writer import location_history_writer
+    from app.services.hierarchy_index import hierarchy_index
+    from app.services.websocket_manager import websocket_manager
+    await open_async_db_connections()
     cleanup_scheduler.start()
+    api_log_writer.start()
+    location_history_writer.start()
+    hierarchy_index.start_polling()
+    websocket_manager.start_broadcasting()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     from app.services.cleanup_scheduler import cleanup_scheduler
+    from app.services.summary_refresh_jobs import summary_refresh_jobs
+    from app.services.api_log_writer import api_log_writer
+    from app.services.location_history_writer import location_history_writer
+    from app.services.hierarchy_index import hierarchy_index
+    from app.services.websocket_manager import websocket_manager
+    await hierarchy_index.stop_polling()
+    await websocket_manager.stop_broadcasting()
     cleanup_scheduler.stop()
+    summary_refresh_jobs.shutdown()
+    # Drain queued request logs and location pings while the DB pool is still open
+    await asyncio.to_thread(api_log_writer.stop)
+    await asyncio.to_thread(location_history_writer.stop)
     close_db_connections()
+    await close_async_db_connections()
@@ -1,4 +1,5 @@
-from typing import Optional, Dict
+import inspect
+from typing import Optional, Dict, List, Sequence
 
 class Voter:
     def __init__(
@@ -442,3 +443,44 @@ class Voter:
             "years_since_migration": self.years_since_migration,
             "scheme_ids": self.scheme_ids
         }
+
+# Attributes every voter exposes; those missing from a row's columns read as None
+VOTER_ATTRIBUTES = frozenset(inspect.signature(Voter.__init__).parameters) - {"self", "kwargs"} | {
+    "constituency_id", "constituency_name", "state_name", "block_name",
+    "panchayat_name", "booth_number", "booth_location", "part_number"
+}
+
+class VoterRow:
+    """Read-only Voter view over a DB row tuple.
+
+    All rows of one result set share a single column -> position index, so a
+    voter costs one small slotted object on top of the tuple the driver returned.
+    """
+    __slots__ = ("_row", "_index")
+
+    def __init__(self, row: Sequence, index: Dict[str, int]):
+        self._row = row
+        self._index = index
+
+    @classmethod
+    def from_rows(cls, columns: Sequence[str], rows: List[Sequence]) -> List["VoterRow"]:
+        index = {column: position for position, column in enumerate(columns)}
+        return [cls(row, index) for row in rows]
+
+    def __getattr__(self, name):
+        position = self._index.get(name)
+        if position is None:
+            if name in VOTER_ATTRIBUTES:
+                return {} if name == "feedback" else None
+            raise AttributeError(f"'VoterRow' object has no attribute '{name}'")
+        value = self._row[position]
+        if name == "feedback":
+            # Same default as Voter.__init__
+            return value or {}
+        return value
+
+    def __repr__(self):
+        return f"VoterRow(epic_id={self.epic_id!r}, booth_id={self.booth_id!r})"
+
+    # Voter.to_dict only reads attributes, so both classes share one dict layout
+    to_dict = Voter.to_dict
@@ -31,6 +31,9 @@ class UserLocationInfo(BaseModel):
     is_online: bool
     last_seen: Optional[datetime]
 
+class NearbyUserLocationInfo(UserLocationInfo):
+    distance_km: Optional[float] = None
+
 class LocationHistoryResponse(BaseModel):
     user_id: int
     locations: List[LocationResponse]
@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field
 import datetime
 
@@ -254,6 +254,35 @@ class VoterBulkUpdateResponse(BaseModel):
     booth_summaries_refreshed: list[int]
     message: str
 
+class VoterSyncChange(BaseModel):
+    """One offline edit replayed by the mobile app"""
+    epic_id: str
+    changes: VoterUpdate
+    base_updated_at: Optional[datetime.datetime] = Field(
+        None, description="updated_at of the voter when the client last read it; omit to skip the conflict check"
+    )
+    client_timestamp: Optional[datetime.datetime] = Field(
+        None, description="When the edit was made on the device; edits to the same voter apply in this order"
+    )
+
+class VoterSync(BaseModel):
+    """Schema for replaying a batch of offline voter edits"""
+    edits: List[VoterSyncChange] = Field(..., min_length=1, max_length=1000)
+
+class VoterSyncResult(BaseModel):
+    epic_id: str
+    status: str = Field(..., description="applied, conflict, not_found or forbidden")
+    updated_at: Optional[datetime.datetime] = None
+    server_values: Optional[Dict[str, Any]] = Field(
+        None, description="Current server values of the edited fields when status is conflict"
+    )
+
+class VoterSyncResponse(BaseModel):
+    applied: int
+    conflicts: int
+    results: List[VoterSyncResult]
+    booth_summaries_refreshed: List[int]
+
 class VoterResponse(VoterBase):
     """
     Full voter response schema returned by the API.
@@ -0,0 +1,46 @@
+from typing import Optional
+from psycopg2.extras import execute_values
+from app.core.config import settings
+from app.services.batch_writer import BatchWriter
+
+class APILogWriter(BatchWriter):
+    """Buffers api_logs rows and writes them in batches from a background thread"""
+
+    name = "API log writer"
+
+    def __init__(
+        self,
+        max_queue_size: int = settings.API_LOG_QUEUE_SIZE,
+        batch_size: int = settings.API_LOG_BATCH_SIZE,
+        flush_interval: float = settings.API_LOG_FLUSH_INTERVAL
+    ):
+        super().__init__(max_queue_size, batch_size, flush_interval)
+
+    def enqueue(
+        self,
+        endpoint: str,
+        method: str,
+        status_code: int,
+        response_time_ms: int,
+        user_id: Optional[int] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> bool:
+        """Queue a row without blocking; the row is dropped and counted when the queue is full"""
+        return self._put((endpoint, method, status_code, response_time_ms, user_id, ip_address, user_agent))
+
+    def write_batch(self, cursor, batch) -> int:
+        # created_at is left to the DB default, the clock the api-stats windows are computed with
+        execute_values(
+            cursor,
+            """
+            INSERT INTO api_logs (endpoint, method, status_code, response_time_ms, user_id, ip_address, user_agent)
+            VALUES %s
+            """,
+            batch,
+            page_size=len(batch)
+        )
+        return len(batch)
+
+# Global API log writer instance
+api_log_writer = APILogWriter()
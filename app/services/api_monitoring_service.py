@@ -1,7 +1,7 @@
 import asyncio
 from typing import Optional
 from app.data.connection import get_db_connection
-from app.utils.logger import logger
+from app.services.api_log_writer import api_log_writer
 
 class APIMonitoringService:
     @staticmethod
@@ -14,21 +14,8 @@ class APIMonitoringService:
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None
     ):
-        """Log API request asynchronously to avoid blocking"""
-        try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    INSERT INTO api_logs (endpoint, method, status_code, response_time_ms, user_id, ip_address, user_agent)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    """,
-                    (endpoint, method, status_code, response_time_ms, user_id, ip_address, user_agent)
-                )
-                conn.commit()
-        except Exception as e:
-            # Don't let monitoring failures break the API
-            logger.error(f"Failed to log API request: {e}")
+        """Queue API request for the background api_logs writer"""
+        api_log_writer.enqueue(endpoint, method, status_code, response_time_ms, user_id, ip_address, user_agent)
 
     @staticmethod
     def get_api_stats(hours: int = 24):
@@ -0,0 +1,120 @@
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict
+from app.data.connection import get_db_connection
+from app.utils.logger import logger
+
+class BatchWriter(ABC):
+    """Bounded queue of rows written in batches from a background thread.
+
+    enqueue never blocks the request: a full queue drops the row and counts it.
+    The thread flushes when a batch fills up or the flush interval elapses, and
+    drains the queue on stop. Subclasses supply write_batch (the INSERT) and
+    their own typed enqueue.
+    """
+
+    # Used in log messages
+    name = "batch writer"
+
+    def __init__(self, max_queue_size: int, batch_size: int, flush_interval: float):
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=max_queue_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.is_running = False
+        self.writer_thread = None
+        self._stats_lock = threading.Lock()
+        self.written_count = 0
+        self.dropped_count = 0
+        self.failed_count = 0
+        self.skipped_count = 0
+        self.flush_count = 0
+        self.flush_seconds_total = 0.0
+        self.last_flush_ms = None
+        self.max_flush_ms = None
+
+    def start(self):
+        """Start the background writer"""
+        if not self.is_running:
+            self.is_running = True
+            self.writer_thread = threading.Thread(target=self._run_writer, daemon=True)
+            self.writer_thread.start()
+            logger.info(f"{self.name} started")
+
+    def stop(self, timeout: float = 10):
+        """Stop the writer after flushing everything already queued"""
+        self.is_running = False
+        if self.writer_thread:
+            self.writer_thread.join(timeout=timeout)
+            self.writer_thread = None
+        logger.info(f"{self.name} stopped ({self._queue.qsize()} rows left unwritten)")
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                "running": self.is_running,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "written": self.written_count,
+                "dropped": self.dropped_count,
+                "failed": self.failed_count,
+                "skipped": self.skipped_count,
+                "flushes": self.flush_count,
+                "flush_seconds_total": round(self.flush_seconds_total, 6),
+                "avg_flush_ms": round(self.flush_seconds_total * 1000 / self.flush_count, 2) if self.flush_count else None,
+                "last_flush_ms": self.last_flush_ms,
+                "max_flush_ms": self.max_flush_ms
+            }
+
+    @abstractmethod
+    def write_batch(self, cursor, batch) -> int:
+        """Insert batch with cursor and return the number of rows written"""
+
+    def _put(self, row: tuple) -> bool:
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped_count += 1
+            return False
+
+    def _run_writer(self):
+        """Flush when a batch fills up or the flush interval elapses; drain the queue on stop"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while self.is_running or not self._queue.empty():
+            try:
+                batch.append(self._queue.get(timeout=max(0.0, min(deadline - time.monotonic(), 1.0))))
+            except queue.Empty:
+                pass
+
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline or (not self.is_running and self._queue.empty()):
+                if batch:
+                    self._flush(batch)
+                    batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+        if batch:
+            self._flush(batch)
+
+    def _flush(self, batch):
+        started = time.monotonic()
+        try:
+            with get_db_connection() as conn:
+                written = self.write_batch(conn.cursor(), batch)
+                conn.commit()
+            elapsed = time.monotonic() - started
+            with self._stats_lock:
+                self.written_count += written
+                self.skipped_count += len(batch) - written
+                self.flush_count += 1
+                self.flush_seconds_total += elapsed
+                self.last_flush_ms = round(elapsed * 1000, 2)
+                self.max_flush_ms = max(self.max_flush_ms or 0.0, self.last_flush_ms)
+        except Exception as e:
+            # A failed batch must never break the requests feeding it
+            with self._stats_lock:
+                self.failed_count += len(batch)
+            logger.error(f"{self.name} failed to write {len(batch)} rows: {e}")
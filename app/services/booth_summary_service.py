@@ -1,183 +1,301 @@
 import json
-from collections import defaultdict
 from typing import List, Dict
+from psycopg2.extras import execute_values
 from app.models.booth_summary import BoothSummary
 from app.data.connection import get_db_connection
 from app.utils.logger import logger
 from datetime import datetime
 
+MALE_VALUES = ["M", "MALE"]
+FEMALE_VALUES = ["F", "FEMALE"]
+
+# Every summary dimension for a set of booths in one pass over voters.
+# Derived columns mirror the Python semantics: empty strings count as missing,
+# gender falls back to "other", and age 56 belongs to no age group.
+BOOTH_AGGREGATION_QUERY = """
+    WITH v AS (
+        SELECT
+            booth_id,
+            CASE
+                WHEN UPPER(gender) IN ('M', 'MALE') THEN 'male'
+                WHEN UPPER(gender) IN ('F', 'FEMALE') THEN 'female'
+                ELSE 'other'
+            END AS gender_key,
+            NULLIF(voting_preference, '') AS party,
+            NULLIF(voted_party, '') AS voted_party,
+            NULLIF(religion, '') AS religion,
+            NULLIF(education_level, '') AS education,
+            NULLIF(employment_status, '') AS employment,
+            NULLIF(category, '') AS category,
+            NULLIF(caste, '') AS caste,
+            CASE
+                WHEN age BETWEEN 18 AND 35 THEN '18-35'
+                WHEN age BETWEEN 36 AND 55 THEN '36-55'
+                WHEN age > 56 THEN '56+'
+            END AS age_group,
+            COALESCE(caste <> '' AND category <> '' AND mobile <> '' AND education_level <> '', false) AS is_complete,
+            COALESCE(mobile <> '' AND voting_preference <> '', false) AS is_verified
+        FROM voters
+        WHERE booth_id = ANY(%s)
+    )
+    SELECT
+        booth_id,
+        GROUPING(gender_key, party, voted_party, religion, education, employment, category, caste, age_group) AS grouping_id,
+        gender_key, party, voted_party, religion, education, employment, category, caste, age_group,
+        COUNT(*) AS voter_count,
+        COUNT(*) FILTER (WHERE is_complete) AS complete_count,
+        COUNT(*) FILTER (WHERE is_verified) AS verified_count
+    FROM v
+    GROUP BY GROUPING SETS (
+        (booth_id),
+        (booth_id, gender_key),
+        (booth_id, party),
+        (booth_id, voted_party),
+        (booth_id, religion),
+        (booth_id, education),
+        (booth_id, employment),
+        (booth_id, age_group),
+        (booth_id, category, caste),
+        (booth_id, party, gender_key),
+        (booth_id, party, age_group),
+        (booth_id, party, category, caste)
+    )
+"""
+
+def _grouping_id(*grouped_columns):
+    """GROUPING() bitmask for a grouping set, columns listed as in BOOTH_AGGREGATION_QUERY"""
+    columns = ["gender_key", "party", "voted_party", "religion", "education", "employment", "category", "caste", "age_group"]
+    mask = 0
+    for position, column in enumerate(columns):
+        if column not in grouped_columns:
+            mask |= 1 << (len(columns) - 1 - position)
+    return mask
+
+AGGREGATION_GROUPING_SETS = {
+    _grouping_id(): "booth",
+    _grouping_id("gender_key"): "gender",
+    _grouping_id("party"): "voting_preference",
+    _grouping_id("voted_party"): "voted_party",
+    _grouping_id("religion"): "religion",
+    _grouping_id("education"): "education",
+    _grouping_id("employment"): "employment",
+    _grouping_id("age_group"): "age_group",
+    _grouping_id("category", "caste"): "category",
+    _grouping_id("party", "gender_key"): "party_gender",
+    _grouping_id("party", "age_group"): "party_age_group",
+    _grouping_id("party", "category", "caste"): "party_category",
+}
+
 class BoothSummaryService:
+    # Voter fields that feed into booth summary counters
+    SUMMARY_FIELDS = {
+        "gender", "age", "voting_preference", "voted_party", "religion", "category",
+        "caste", "education_level", "employment_status", "mobile"
+    }
+    # Booths aggregated per query when refreshing many summaries
+    REFRESH_BATCH_SIZE = 50
+
     def __init__(self, adapter):
         self.adapter = adapter
 
     def calculate_booth_summary(self, booth_id: int) -> BoothSummary:
         """Calculate aggregations for a specific booth"""
-        voters = self.adapter.get_voters(booth_ids=[booth_id])
-        
-        summary = BoothSummary(
-            booth_id=booth_id,
-            constituency_id=None  # Will be populated from booth table if needed
-        )
-        
-        if not voters:
-            return summary
+        return self.calculate_booth_summaries([booth_id])[booth_id]
+
+    def calculate_booth_summaries(self, booth_ids: List[int]) -> Dict[int, BoothSummary]:
+        """Calculate aggregations for many booths with a single GROUPING SETS query"""
+        with get_db_connection() as conn:
+            return self._aggregate_booth_summaries(conn.cursor(), booth_ids)
+
+    def _aggregate_booth_summaries(self, cursor, booth_ids: List[int]) -> Dict[int, BoothSummary]:
+        summaries = {
+            booth_id: BoothSummary(
+                booth_id=booth_id,
+                constituency_id=None  # Will be populated from booth table if needed
+            )
+            for booth_id in booth_ids
+        }
+        if not booth_ids:
+            return summaries
+
+        cursor.execute(BOOTH_AGGREGATION_QUERY, (list(booth_ids),))
+        for row in cursor.fetchall():
+            self._apply_aggregate_row(summaries[row[0]], row)
+
+        for summary in summaries.values():
+            summary.other_gender_voters = summary.total_voters - summary.male_voters - summary.female_voters
+
+        return summaries
+
+    def _apply_aggregate_row(self, summary: BoothSummary, row):
+        """Fold one GROUPING SETS result row into the matching summary dimension"""
+        (_, grouping_id, gender, party, voted_party, religion, education, employment,
+         category, caste, age_group, voter_count, complete_count, verified_count) = row
+        grouping_set = AGGREGATION_GROUPING_SETS.get(grouping_id)
+
+        if grouping_set == "booth":
+            summary.total_voters = voter_count
+            summary.complete_voter_count = complete_count
+            summary.verified_voter_count = verified_count
+        elif grouping_set == "gender":
+            if gender == "male":
+                summary.male_voters = voter_count
+            elif gender == "female":
+                summary.female_voters = voter_count
+        elif grouping_set == "voting_preference" and party:
+            summary.voting_preference_counts[party] = voter_count
+        elif grouping_set == "voted_party" and voted_party:
+            summary.voted_party_counts[voted_party] = voter_count
+        elif grouping_set == "religion" and religion:
+            summary.religion_counts[religion] = voter_count
+        elif grouping_set == "education" and education:
+            summary.education_counts[education] = voter_count
+        elif grouping_set == "employment" and employment:
+            summary.employment_counts[employment] = voter_count
+        elif grouping_set == "age_group":
+            if not summary.age_group_counts:
+                summary.age_group_counts = {"18-35": 0, "36-55": 0, "56+": 0}
+            if age_group:
+                summary.age_group_counts[age_group] = voter_count
+        elif grouping_set == "category" and category:
+            entry = summary.category_counts.setdefault(category, {"total": 0, "breakdown": {}})
+            entry["total"] += voter_count
+            if caste:
+                entry["breakdown"][caste] = voter_count
+        elif grouping_set == "party_gender" and party:
+            entry = summary.party_wise_gender_counts.setdefault(party, {"male": 0, "female": 0, "other": 0})
+            entry[gender] = voter_count
+        elif grouping_set == "party_age_group" and party and age_group:
+            entry = summary.party_wise_age_group_counts.setdefault(party, {"18-35": 0, "36-55": 0, "56+": 0})
+            entry[age_group] = voter_count
+        elif grouping_set == "party_category" and party and category:
+            categories = summary.party_wise_category_counts.setdefault(party, {})
+            entry = categories.setdefault(category, {"total": 0, "castes": {}})
+            entry["total"] += voter_count
+            if caste:
+                entry["castes"][caste] = voter_count
 
-        # Basic counts
-        summary.total_voters = len(voters)
-        summary.male_voters = sum(1 for v in voters if str(v.get("gender", "")).upper() in ["M", "MALE"])
-        summary.female_voters = sum(1 for v in voters if str(v.get("gender", "")).upper() in ["F", "FEMALE"])
+    def _age_group(self, age):
+        """Age bucket used by the age group counters, or None if outside every bucket"""
+        try:
+            age = int(age)
+        except (TypeError, ValueError):
+            return None
+        if 18 <= age <= 35:
+            return "18-35"
+        if 36 <= age <= 55:
+            return "36-55"
+        if age > 56:
+            return "56+"
+        return None
+
+    def _bump(self, counts: Dict, key: str, delta: int):
+        """Add delta to counts[key], dropping the key when it reaches zero"""
+        counts[key] = counts.get(key, 0) + delta
+        if counts[key] <= 0:
+            del counts[key]
+
+    def _apply_voter(self, summary: BoothSummary, voter: Dict, sign: int):
+        """Add (sign=1) or remove (sign=-1) one voter's contribution to every summary counter"""
+        party = voter.get("voting_preference")
+        gender = str(voter.get("gender", "")).upper()
+        category = voter.get("category")
+        caste = voter.get("caste")
+        age_group = self._age_group(voter.get("age")) if voter.get("age") else None
+
+        summary.total_voters += sign
+        if gender in MALE_VALUES:
+            summary.male_voters += sign
+            gender_key = "male"
+        elif gender in FEMALE_VALUES:
+            summary.female_voters += sign
+            gender_key = "female"
+        else:
+            gender_key = "other"
         summary.other_gender_voters = summary.total_voters - summary.male_voters - summary.female_voters
 
-        # Aggregation counts
-        summary.voting_preference_counts = self._count_field(voters, "voting_preference")
-        summary.voted_party_counts = self._count_field(voters, "voted_party")
-        summary.party_wise_gender_counts = self._count_party_wise_gender(voters)
-        summary.party_wise_age_group_counts = self._count_party_wise_age_groups(voters)
-        summary.party_wise_category_counts = self._count_party_wise_category(voters)
-        summary.religion_counts = self._count_field(voters, "religion")
-        summary.category_counts = self._count_nested_field(voters, "category", "caste")
-        summary.education_counts = self._count_field(voters, "education_level")
-        summary.employment_counts = self._count_field(voters, "employment_status")
-        summary.age_group_counts = self._count_age_groups(voters)
-        summary.complete_voter_count = self._count_complete_voters(voters)
-        summary.verified_voter_count = self._count_verified_voters(voters)
-
-        return summary
-
-    def _count_field(self, voters: List[Dict], field: str) -> Dict[str, int]:
-        """Count occurrences of field values"""
-        counts = defaultdict(int)
-        for voter in voters:
-            value = voter.get(field)
-            if value:
-                counts[str(value)] += 1
-        return dict(counts)
-
-    def _count_nested_field(self, voters: List[Dict], main_field: str, sub_field: str) -> Dict[str, Dict]:
-        """Count occurrences with nested structure: main_field -> sub_field breakdown"""
-        nested_counts = defaultdict(lambda: {"total": 0, "breakdown": defaultdict(int)})
-        
-        for voter in voters:
-            main_value = voter.get(main_field)
-            sub_value = voter.get(sub_field)
-            
-            if main_value:
-                main_key = str(main_value)
-                nested_counts[main_key]["total"] += 1
-                
-                if sub_value:
-                    nested_counts[main_key]["breakdown"][str(sub_value)] += 1
-        
-        # Convert defaultdict to regular dict
-        result = {}
-        for main_key, data in nested_counts.items():
-            result[main_key] = {
-                "total": data["total"],
-                "breakdown": dict(data["breakdown"])
-            }
-        
-        return result
-
-    def _count_age_groups(self, voters: List[Dict]) -> Dict[str, int]:
-        """Count voters by age groups"""
-        groups = {"18-35": 0, "36-55": 0, "56+": 0}
-        for voter in voters:
-            age = voter.get("age")
-            if age:
-                try:
-                    age = int(age)
-                    if 18 <= age <= 35:
-                        groups["18-35"] += 1
-                    elif 36 <= age <= 55:
-                        groups["36-55"] += 1
-                    elif age > 56:
-                        groups["56+"] += 1
-                except ValueError:
-                    pass
-        return groups
-
-    def _count_complete_voters(self, voters: List[Dict]) -> int:
-        """Count voters with caste, category, phone, education"""
-        count = 0
-        for voter in voters:
-            if (voter.get("caste") and voter.get("category") and 
-                voter.get("mobile") and voter.get("education_level")):
-                count += 1
-        return count
-
-    def _count_verified_voters(self, voters: List[Dict]) -> int:
-        """Count voters with phone and voting_preference"""
-        count = 0
-        for voter in voters:
-            if voter.get("mobile") and voter.get("voting_preference"):
-                count += 1
-        return count
-
-    def _count_party_wise_gender(self, voters: List[Dict]) -> Dict[str, Dict]:
-        """Count gender distribution by party"""
-        party_gender = defaultdict(lambda: {"male": 0, "female": 0, "other": 0})
-        
-        for voter in voters:
-            party = voter.get("voting_preference")
-            gender = str(voter.get("gender", "")).upper()
-            
-            if party:
-                if gender in ["M", "MALE"]:
-                    party_gender[party]["male"] += 1
-                elif gender in ["F", "FEMALE"]:
-                    party_gender[party]["female"] += 1
-                else:
-                    party_gender[party]["other"] += 1
-        
-        return dict(party_gender)
+        for field, counts in (
+            ("voting_preference", summary.voting_preference_counts),
+            ("voted_party", summary.voted_party_counts),
+            ("religion", summary.religion_counts),
+            ("education_level", summary.education_counts),
+            ("employment_status", summary.employment_counts),
+        ):
+            if voter.get(field):
+                self._bump(counts, str(voter[field]), sign)
 
-    def _count_party_wise_age_groups(self, voters: List[Dict]) -> Dict[str, Dict]:
-        """Count age group distribution by party"""
-        party_age = defaultdict(lambda: {"18-35": 0, "36-55": 0, "56+": 0})
-        
-        for voter in voters:
-            party = voter.get("voting_preference")
-            age = voter.get("age")
-            
-            if party and age:
-                try:
-                    age = int(age)
-                    if 18 <= age <= 35:
-                        party_age[party]["18-35"] += 1
-                    elif 36 <= age <= 55:
-                        party_age[party]["36-55"] += 1
-                    elif age > 56:
-                        party_age[party]["56+"] += 1
-                except ValueError:
-                    pass
-        
-        return dict(party_age)
+        if category:
+            entry = summary.category_counts.setdefault(str(category), {"total": 0, "breakdown": {}})
+            entry["total"] += sign
+            if caste:
+                self._bump(entry["breakdown"], str(caste), sign)
+            if entry["total"] <= 0:
+                del summary.category_counts[str(category)]
 
-    def _count_party_wise_category(self, voters: List[Dict]) -> Dict[str, Dict]:
-        """Count category-caste distribution by party (3-level aggregation)"""
-        party_category_caste = defaultdict(lambda: defaultdict(lambda: {"total": 0, "castes": defaultdict(int)}))
-        
-        for voter in voters:
-            party = voter.get("voting_preference")
-            category = voter.get("category")
-            caste = voter.get("caste")
-            
-            if party and category:
-                party_category_caste[party][str(category)]["total"] += 1
+        if age_group:
+            summary.age_group_counts[age_group] = summary.age_group_counts.get(age_group, 0) + sign
+
+        if party:
+            gender_counts = summary.party_wise_gender_counts.setdefault(party, {"male": 0, "female": 0, "other": 0})
+            gender_counts[gender_key] += sign
+            if not any(gender_counts.values()):
+                del summary.party_wise_gender_counts[party]
+
+            if age_group:
+                age_counts = summary.party_wise_age_group_counts.setdefault(party, {"18-35": 0, "36-55": 0, "56+": 0})
+                age_counts[age_group] += sign
+                if not any(age_counts.values()):
+                    del summary.party_wise_age_group_counts[party]
+
+            if category:
+                categories = summary.party_wise_category_counts.setdefault(party, {})
+                entry = categories.setdefault(str(category), {"total": 0, "castes": {}})
+                entry["total"] += sign
                 if caste:
-                    party_category_caste[party][str(category)]["castes"][str(caste)] += 1
-        
-        # Convert nested defaultdict to regular dict
-        result = {}
-        for party, categories in party_category_caste.items():
-            result[party] = {}
-            for category, data in categories.items():
-                result[party][category] = {
-                    "total": data["total"],
-                    "castes": dict(data["castes"])
-                }
-        
-        return result
+                    self._bump(entry["castes"], str(caste), sign)
+                if entry["total"] <= 0:
+                    del categories[str(category)]
+                if not categories:
+                    del summary.party_wise_category_counts[party]
+
+        if caste and category and voter.get("mobile") and voter.get("education_level"):
+            summary.complete_voter_count += sign
+        if voter.get("mobile") and party:
+            summary.verified_voter_count += sign
+
+    def apply_voter_delta(self, booth_id: int, old_voter: Dict, new_voter: Dict) -> bool:
+        """Incrementally apply one voter edit to the stored booth summary.
+
+        Returns False when the booth has no stored summary yet, in which case the
+        caller should fall back to update_booth_summary.
+        """
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Row lock serializes concurrent edits to the same booth
+            cursor.execute("SELECT * FROM booth_summaries WHERE booth_id = %s FOR UPDATE", (booth_id,))
+            row = cursor.fetchone()
+            if not row:
+                conn.rollback()
+                return False
+
+            columns = [desc[0] for desc in cursor.description]
+            summary = BoothSummary.from_dict(dict(zip(columns, row)))
+            self._apply_voter(summary, old_voter, -1)
+            self._apply_voter(summary, new_voter, 1)
+
+            self._upsert_booth_summary(cursor, summary)
+            conn.commit()
+        return True
+
+    def reconcile_booth_summaries(self):
+        """Recompute every stored booth summary from scratch to correct any incremental drift"""
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT booth_id FROM booth_summaries ORDER BY booth_id")
+            booth_ids = [row[0] for row in cursor.fetchall()]
+
+        self.refresh_all_summaries(booth_ids)
+        return len(booth_ids)
 
     def update_booth_summary(self, booth_id: int):
         """Update summary for a specific booth"""
@@ -189,59 +307,84 @@ class BoothSummaryService:
         """Save booth summary to PostgreSQL"""
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            
-            cursor.execute(
-                """
-                INSERT INTO booth_summaries (
-                    booth_id, constituency_id, total_voters, male_voters, female_voters, 
-                    other_gender_voters, voting_preference_counts, voted_party_counts, 
-                    party_wise_gender_counts, party_wise_age_group_counts, party_wise_category_counts,
-                    religion_counts, category_counts, education_counts, employment_counts, age_group_counts, 
-                    complete_voter_count, verified_voter_count, scheme_beneficiaries_counts, polled_count
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (booth_id) DO UPDATE SET
-                    constituency_id = EXCLUDED.constituency_id,
-                    total_voters = EXCLUDED.total_voters,
-                    male_voters = EXCLUDED.male_voters,
-                    female_voters = EXCLUDED.female_voters,
-                    other_gender_voters = EXCLUDED.other_gender_voters,
-                    voting_preference_counts = EXCLUDED.voting_preference_counts,
-                    voted_party_counts = EXCLUDED.voted_party_counts,
-                    polled_count = EXCLUDED.polled_count,
-                    party_wise_gender_counts = EXCLUDED.party_wise_gender_counts,
-                    party_wise_age_group_counts = EXCLUDED.party_wise_age_group_counts,
-                    party_wise_category_counts = EXCLUDED.party_wise_category_counts,
-                    religion_counts = EXCLUDED.religion_counts,
-                    category_counts = EXCLUDED.category_counts,
-                    education_counts = EXCLUDED.education_counts,
-                    employment_counts = EXCLUDED.employment_counts,
-                    age_group_counts = EXCLUDED.age_group_counts,
-                    complete_voter_count = EXCLUDED.complete_voter_count,
-                    verified_voter_count = EXCLUDED.verified_voter_count,
-                    scheme_beneficiaries_counts = EXCLUDED.scheme_beneficiaries_counts,
-                    last_updated = CURRENT_TIMESTAMP
-                """,
-                (
-                    summary.booth_id, summary.constituency_id, summary.total_voters,
-                    summary.male_voters, summary.female_voters, summary.other_gender_voters,
-                    json.dumps(summary.voting_preference_counts),
-                    json.dumps(summary.voted_party_counts),
-                    json.dumps(summary.party_wise_gender_counts),
-                    json.dumps(summary.party_wise_age_group_counts),
-                    json.dumps(summary.party_wise_category_counts),
-                    json.dumps(summary.religion_counts),
-                    json.dumps(summary.category_counts),
-                    json.dumps(summary.education_counts),
-                    json.dumps(summary.employment_counts),
-                    json.dumps(summary.age_group_counts),
-                    summary.complete_voter_count,
-                    summary.verified_voter_count,
-                    json.dumps(summary.scheme_beneficiaries_counts),
-                    summary.polled_count
-                )
-            )
+            self._upsert_booth_summary(cursor, summary)
             conn.commit()
 
+    def _upsert_booth_summary(self, cursor, summary: BoothSummary):
+        self._upsert_booth_summaries(cursor, [summary])
+
+    def _upsert_booth_summaries(self, cursor, summaries: List[BoothSummary]):
+        """Write many booth summaries with one multi-row INSERT ... ON CONFLICT"""
+        if not summaries:
+            return
+        execute_values(
+            cursor,
+            """
+            INSERT INTO booth_summaries (
+                booth_id, constituency_id, total_voters, male_voters, female_voters, 
+                other_gender_voters, voting_preference_counts, voted_party_counts, 
+                party_wise_gender_counts, party_wise_age_group_counts, party_wise_category_counts,
+                religion_counts, category_counts, education_counts, employment_counts, age_group_counts, 
+                complete_voter_count, verified_voter_count, scheme_beneficiaries_counts, polled_count
+            ) VALUES %s
+            ON CONFLICT (booth_id) DO UPDATE SET
+                constituency_id = EXCLUDED.constituency_id,
+                total_voters = EXCLUDED.total_voters,
+                male_voters = EXCLUDED.male_voters,
+                female_voters = EXCLUDED.female_voters,
+                other_gender_voters = EXCLUDED.other_gender_voters,
+                voting_preference_counts = EXCLUDED.voting_preference_counts,
+                voted_party_counts = EXCLUDED.voted_party_counts,
+                polled_count = EXCLUDED.polled_count,
+                party_wise_gender_counts = EXCLUDED.party_wise_gender_counts,
+                party_wise_age_group_counts = EXCLUDED.party_wise_age_group_counts,
+                party_wise_category_counts = EXCLUDED.party_wise_category_counts,
+                religion_counts = EXCLUDED.religion_counts,
+                category_counts = EXCLUDED.category_counts,
+                education_counts = EXCLUDED.education_counts,
+                employment_counts = EXCLUDED.employment_counts,
+                age_group_counts = EXCLUDED.age_group_counts,
+                complete_voter_count = EXCLUDED.complete_voter_count,
+                verified_voter_count = EXCLUDED.verified_voter_count,
+                scheme_beneficiaries_counts = EXCLUDED.scheme_beneficiaries_counts,
+                last_updated = CURRENT_TIMESTAMP
+            """,
+            [(
+                summary.booth_id, summary.constituency_id, summary.total_voters,
+                summary.male_voters, summary.female_voters, summary.other_gender_voters,
+                json.dumps(summary.voting_preference_counts),
+                json.dumps(summary.voted_party_counts),
+                json.dumps(summary.party_wise_gender_counts),
+                json.dumps(summary.party_wise_age_group_counts),
+                json.dumps(summary.party_wise_category_counts),
+                json.dumps(summary.religion_counts),
+                json.dumps(summary.category_counts),
+                json.dumps(summary.education_counts),
+                json.dumps(summary.employment_counts),
+                json.dumps(summary.age_group_counts),
+                summary.complete_voter_count,
+                summary.verified_voter_count,
+                json.dumps(summary.scheme_beneficiaries_counts),
+                summary.polled_count
+            ) for summary in summaries],
+            page_size=len(summaries)
+        )
+
+    def get_summaries_version(self, booth_ids: List[int] = None):
+        """(count, max last_updated, last_updated checksum) over the selected summaries"""
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+
+            query = "SELECT COUNT(*), MAX(last_updated), SUM(EXTRACT(EPOCH FROM last_updated))::text FROM booth_summaries"
+            params = []
+
+            if booth_ids:
+                query += " WHERE booth_id = ANY(%s)"
+                params.append(booth_ids)
+
+            cursor.execute(query, params)
+            return cursor.fetchone()
+
     def get_booth_summaries(self, booth_ids: List[int] = None) -> List[BoothSummary]:
         """Get booth summaries with optional filtering"""
         with get_db_connection() as conn:
@@ -266,9 +409,18 @@ class BoothSummaryService:
             
             return summaries
 
+    def refresh_booth_batch(self, booth_ids: List[int]):
+        """Aggregate and upsert one batch of booths on a single connection"""
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            summaries = self._aggregate_booth_summaries(cursor, booth_ids)
+            self._upsert_booth_summaries(cursor, list(summaries.values()))
+            conn.commit()
+
     def refresh_all_summaries(self, booth_ids):
-        """Recalculate all booth summaries"""
-        for booth_id in booth_ids:
-            self.update_booth_summary(booth_id)
+        """Recalculate all booth summaries, one aggregation query per batch of booths"""
+        booth_ids = list(booth_ids)
+        for start in range(0, len(booth_ids), self.REFRESH_BATCH_SIZE):
+            self.refresh_booth_batch(booth_ids[start:start + self.REFRESH_BATCH_SIZE])
         
-        logger.info(f"Refreshed summaries for {len(booth_ids)} booths")
\ No newline at end of file
+        logger.info(f"Refreshed summaries for {len(booth_ids)} booths")
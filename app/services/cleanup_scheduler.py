@@ -2,11 +2,16 @@ import asyncio
 import threading
 from datetime import datetime, timedelta
 from app.services.location_service import LocationService
+from app.services.booth_summary_service import BoothSummaryService
+from app.data.postgres_adapter import PostgresAdapter
+from app.core.config import settings
 from app.utils.logger import logger
 
 class CleanupScheduler:
     def __init__(self):
         self.location_service = LocationService()
+        self.booth_summary_service = BoothSummaryService(PostgresAdapter())
+        self.last_reconciled_at = None
         self.is_running = False
         self.cleanup_thread = None
 
@@ -50,6 +55,13 @@ class CleanupScheduler:
             
             # Clean up old location records
             self.location_service.cleanup_old_locations()
+
+            # Periodically recompute booth summaries maintained incrementally by voter edits
+            reconcile_interval = timedelta(hours=settings.BOOTH_SUMMARY_RECONCILE_HOURS)
+            if not self.last_reconciled_at or datetime.now() - self.last_reconciled_at >= reconcile_interval:
+                reconciled = self.booth_summary_service.reconcile_booth_summaries()
+                self.last_reconciled_at = datetime.now()
+                logger.info(f"Reconciled {reconciled} booth summaries")
             
             logger.info("Scheduled cleanup completed")
             
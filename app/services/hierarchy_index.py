@@ -0,0 +1,267 @@
+import asyncio
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.data.async_postgres_adapter import AsyncPostgresAdapter
+from app.utils.helpers import json_default, make_etag
+from app.utils.logger import logger
+
+# Parent of each level; booths also point at their constituency directly
+PARENT_LEVELS = {
+    "district": ("state", "state_id"),
+    "constituency": ("district", "district_id"),
+    "block": ("constituency", "constituency_id"),
+    "panchayat": ("block", "block_id"),
+    "booth": ("panchayat", "panchayat_id"),
+}
+
+# Cached response bodies per version; a reload clears them
+MAX_CACHED_RESPONSES = 2000
+
+class HierarchyIndex:
+    """Versioned in-memory copy of states → districts → constituencies → blocks → panchayats → booths"""
+
+    def __init__(self, adapter: AsyncPostgresAdapter = None):
+        self.adapter = adapter or AsyncPostgresAdapter()
+        self.version = 0
+        self.fingerprint = None
+        self.loaded_at = None
+        self._stale = True
+        self._load_lock = asyncio.Lock()
+        self._poll_task = None
+        self._responses: Dict[Tuple, Tuple[bytes, str]] = {}
+
+    async def ensure_loaded(self):
+        if self._stale:
+            async with self._load_lock:
+                if self._stale:
+                    await self._load()
+
+    def invalidate(self):
+        """Mark the index stale; the next request reloads it"""
+        self._stale = True
+
+    async def reload(self) -> int:
+        self.invalidate()
+        await self.ensure_loaded()
+        return self.version
+
+    async def check_for_changes(self) -> bool:
+        """Reload when the hierarchy tables no longer match the loaded fingerprint"""
+        fingerprint = await self.adapter.get_hierarchy_fingerprint()
+        if fingerprint == self.fingerprint:
+            return False
+        logger.info("Hierarchy tables changed, reloading index")
+        await self.reload()
+        return True
+
+    def start_polling(self):
+        if settings.HIERARCHY_POLL_SECONDS > 0 and not self._poll_task:
+            self._poll_task = asyncio.create_task(self._poll())
+
+    async def stop_polling(self):
+        if self._poll_task:
+            self._poll_task.cancel()
+            try:
+                await self._poll_task
+            except asyncio.CancelledError:
+                pass
+            self._poll_task = None
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(settings.HIERARCHY_POLL_SECONDS)
+            try:
+                await self.check_for_changes()
+            except Exception as e:
+                logger.error(f"Hierarchy change detection failed: {e}")
+
+    async def _load(self):
+        snapshot = await self.adapter.get_hierarchy_snapshot()
+
+        self.states = snapshot["states"]
+        self.districts = snapshot["districts"]
+        self.constituencies = snapshot["constituencies"]
+        self.blocks = snapshot["blocks"]
+        self.panchayats = snapshot["panchayats"]
+        self.booths = snapshot["booths"]
+
+        self.by_id = {
+            "state": {s["state_id"]: s for s in self.states},
+            "district": {d["district_id"]: d for d in self.districts},
+            "constituency": {c["constituency_id"]: c for c in self.constituencies},
+            "block": {b["block_id"]: b for b in self.blocks},
+            "panchayat": {p["panchayat_id"]: p for p in self.panchayats},
+            "booth": {b["booth_id"]: b for b in self.booths},
+        }
+
+        # Parent → children, each list kept in display order
+        self.children = defaultdict(lambda: defaultdict(list))
+        for row in self.districts:
+            self.children["state_districts"][row["state_id"]].append(row)
+        for row in self.constituencies:
+            self.children["state_constituencies"][row["state_id"]].append(row)
+            self.children["district_constituencies"][row["district_id"]].append(row)
+        for row in self.blocks:
+            self.children["constituency_blocks"][row["constituency_id"]].append(row)
+        for row in self.panchayats:
+            self.children["block_panchayats"][row["block_id"]].append(row)
+        for row in self.booths:
+            self.children["constituency_booths"][row["constituency_id"]].append(row)
+            self.children["panchayat_booths"][row["panchayat_id"]].append(row)
+
+        # Child → ancestors
+        self.ancestors = {level: {} for level in PARENT_LEVELS}
+        for level in PARENT_LEVELS:
+            for item_id in self.by_id[level]:
+                self.ancestors[level][item_id] = self._walk_ancestors(level, item_id)
+
+        # Name ranks reproduce ORDER BY block_name, panchayat_name, booth_number ties
+        self._block_rank = self._rank(self.blocks, "block_id", "block_name")
+        self._panchayat_rank = self._rank(self.panchayats, "panchayat_id", "panchayat_name")
+        self._booth_rank = self._rank(self.booths, "booth_id", "booth_number")
+
+        self.fingerprint = snapshot["fingerprint"]
+        self.version += 1
+        self.loaded_at = datetime.now()
+        self._responses = {}
+        self._stale = False
+        logger.info(
+            f"Loaded hierarchy index v{self.version}: {len(self.states)} states, {len(self.constituencies)} constituencies, "
+            f"{len(self.blocks)} blocks, {len(self.panchayats)} panchayats, {len(self.booths)} booths"
+        )
+
+    def _walk_ancestors(self, level: str, item_id: int) -> Dict[str, int]:
+        ancestors = {}
+        row = self.by_id[level].get(item_id)
+        while row is not None and level in PARENT_LEVELS:
+            parent_level, parent_key = PARENT_LEVELS[level]
+            parent_id = row.get(parent_key)
+            if parent_id is None and level == "booth":
+                # Booths without a panchayat still belong to a constituency
+                parent_level, parent_key = "constituency", "constituency_id"
+                parent_id = row.get(parent_key)
+            if parent_id is None:
+                break
+            ancestors[parent_key] = parent_id
+            level, row = parent_level, self.by_id[parent_level].get(parent_id)
+        return ancestors
+
+    def _rank(self, rows: List[Dict], id_key: str, sort_key: str) -> Dict[int, int]:
+        ranks, rank, previous = {}, -1, object()
+        for row in rows:
+            if row[sort_key] != previous:
+                rank, previous = rank + 1, row[sort_key]
+            ranks[row[id_key]] = rank
+        return ranks
+
+    def get_ancestors(self, level: str, item_id: int) -> Dict[str, int]:
+        """Ancestor ids keyed by column name, e.g. get_ancestors("booth", 12)["state_id"]"""
+        return dict(self.ancestors.get(level, {}).get(item_id, {}))
+
+    def get_children(self, relation: str, parent_id: int) -> List[Dict]:
+        """Children in display order, e.g. get_children("block_panchayats", 3)"""
+        return list(self.children[relation].get(parent_id, []))
+
+    async def get_response(self, key: Tuple, build: Callable[[], List[Dict]]) -> Tuple[bytes, str]:
+        """Serialized body and ETag for key, built once per index version"""
+        await self.ensure_loaded()
+        cached = self._responses.get(key)
+        if cached:
+            return cached
+
+        body = json.dumps(build(), default=json_default, ensure_ascii=False).encode()
+        cached = (body, make_etag(body))
+        if len(self._responses) >= MAX_CACHED_RESPONSES:
+            self._responses.clear()
+        self._responses[key] = cached
+        return cached
+
+    # Endpoint views; filters mirror the SQL they replace (falsy ids mean no filter)
+
+    def list_states(self) -> List[Dict]:
+        return self.states
+
+    def list_districts(self, state_id: Optional[int] = None) -> List[Dict]:
+        if state_id:
+            return self.get_children("state_districts", state_id)
+        return self.districts
+
+    def list_constituencies(self, state_id: Optional[int] = None, district_id: Optional[int] = None) -> List[Dict]:
+        rows = self.get_children("state_constituencies", state_id) if state_id else self.constituencies
+        if district_id:
+            rows = [row for row in rows if row["district_id"] == district_id]
+        return rows
+
+    def list_blocks(self, constituency_id: Optional[int] = None) -> List[Dict]:
+        rows = self.get_children("constituency_blocks", constituency_id) if constituency_id else self.blocks
+        return [
+            {
+                "block_id": block["block_id"],
+                "block_name": block["block_name"],
+                "constituency_id": block["constituency_id"],
+                "panchayats": [
+                    {
+                        "panchayat_id": panchayat["panchayat_id"],
+                        "panchayat_name": panchayat["panchayat_name"],
+                        "booths": self._booth_briefs(panchayat["panchayat_id"])
+                    }
+                    for panchayat in self.get_children("block_panchayats", block["block_id"])
+                ]
+            }
+            for block in rows
+        ]
+
+    def list_panchayats(self, block_id: Optional[int] = None) -> List[Dict]:
+        rows = self.get_children("block_panchayats", block_id) if block_id else self.panchayats
+        return [
+            {
+                "panchayat_id": panchayat["panchayat_id"],
+                "panchayat_name": panchayat["panchayat_name"],
+                "block_id": panchayat["block_id"],
+                "booths": self._booth_briefs(panchayat["panchayat_id"])
+            }
+            for panchayat in rows
+        ]
+
+    def list_booths(self, constituency_id: Optional[int] = None, panchayat_id: Optional[int] = None) -> List[Dict]:
+        rows = self.get_children("constituency_booths", constituency_id) if constituency_id else self.booths
+        if panchayat_id:
+            rows = [row for row in rows if row["panchayat_id"] == panchayat_id]
+        return [self._booth_brief(row) for row in rows]
+
+    def list_booths_by_blocks(self, block_ids: List[int]) -> List[Dict]:
+        ranked = []
+        for block_id in set(block_ids):
+            block = self.by_id["block"].get(block_id)
+            if not block:
+                continue
+            for panchayat in self.get_children("block_panchayats", block_id):
+                for booth in self.get_children("panchayat_booths", panchayat["panchayat_id"]):
+                    constituency = self.by_id["constituency"].get(booth["constituency_id"])
+                    if not constituency:
+                        continue
+                    rank = (
+                        self._block_rank[block_id],
+                        self._panchayat_rank[panchayat["panchayat_id"]],
+                        self._booth_rank[booth["booth_id"]]
+                    )
+                    ranked.append((rank, {
+                        **booth,
+                        "panchayat_name": panchayat["panchayat_name"],
+                        "block_name": block["block_name"],
+                        "constituency_name": constituency["constituency_name"]
+                    }))
+        ranked.sort(key=lambda item: item[0])
+        return [row for _, row in ranked]
+
+    def _booth_briefs(self, panchayat_id: int) -> List[Dict]:
+        return [self._booth_brief(row) for row in self.get_children("panchayat_booths", panchayat_id)]
+
+    def _booth_brief(self, row: Dict) -> Dict:
+        return {"booth_id": row["booth_id"], "booth_number": row["booth_number"], "booth_location": row["booth_location"]}
+
+# Global hierarchy index instance
+hierarchy_index = HierarchyIndex()
@@ -1,12 +1,28 @@
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional, Set, Tuple
 from datetime import datetime, timedelta
+import math
 import threading
 
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LATITUDE = 111.32
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
 class LocationCache:
+    # Uniform grid over lat/lon; 0.01 degrees is about 1.1 km north-south
+    GRID_CELL_DEGREES = 0.01
+
     def __init__(self):
         self._cache: Dict[int, dict] = {}
         self._lock = threading.Lock()
         self.ONLINE_THRESHOLD_MINUTES = 2
+        # Grid cell -> users whose latest location falls in it
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}
+        self._cell_by_user: Dict[int, Tuple[int, int]] = {}
 
     def update_location(self, user_id: int, latitude: float, longitude: float, accuracy: Optional[float] = None):
         """Update user's latest location in cache"""
@@ -18,6 +34,13 @@ class LocationCache:
                 "last_updated": datetime.now(),
                 "is_online": True
             }
+            cell = self._cell(latitude, longitude)
+            previous_cell = self._cell_by_user.get(user_id)
+            if previous_cell != cell:
+                if previous_cell is not None:
+                    self._remove_from_cell(user_id, previous_cell)
+                self._cells.setdefault(cell, set()).add(user_id)
+                self._cell_by_user[user_id] = cell
 
     def get_location(self, user_id: int) -> Optional[dict]:
         """Get user's latest location from cache"""
@@ -41,10 +64,63 @@ class LocationCache:
                 result[user_id] = location_copy
             return result
 
+    def get_locations(self, user_ids) -> Dict[int, dict]:
+        """Get cached locations for the given users only"""
+        with self._lock:
+            current_time = datetime.now()
+            result = {}
+            for user_id in user_ids:
+                location = self._cache.get(user_id)
+                if location:
+                    result[user_id] = self._with_online_status(location, current_time)
+            return result
+
+    def get_locations_in_bbox(
+        self, min_lat: float, min_lon: float, max_lat: float, max_lon: float, user_ids: Optional[Iterable[int]] = None
+    ) -> Dict[int, dict]:
+        """Cached locations inside a lat/lon box, optionally only for user_ids; visits only the grid cells it covers"""
+        allowed = set(user_ids) if user_ids is not None else None
+        with self._lock:
+            current_time = datetime.now()
+            result = {}
+            for user_id in self._candidates(min_lat, min_lon, max_lat, max_lon, allowed):
+                location = self._cache[user_id]
+                if min_lat <= location["latitude"] <= max_lat and min_lon <= location["longitude"] <= max_lon:
+                    result[user_id] = self._with_online_status(location, current_time)
+            return result
+
+    def get_locations_within(
+        self, latitude: float, longitude: float, radius_km: float, user_ids: Optional[Iterable[int]] = None
+    ) -> Dict[int, dict]:
+        """Cached locations within radius_km of a point, nearest first, each with its distance_km"""
+        lat_delta = radius_km / KM_PER_DEGREE_LATITUDE
+        # Longitude degrees shrink with latitude; near the poles the box spans every longitude
+        cos_lat = math.cos(math.radians(min(89.0, abs(latitude) + lat_delta)))
+        lon_delta = min(180.0, radius_km / (KM_PER_DEGREE_LATITUDE * cos_lat))
+
+        allowed = set(user_ids) if user_ids is not None else None
+        with self._lock:
+            current_time = datetime.now()
+            matches = []
+            for user_id in self._candidates(latitude - lat_delta, longitude - lon_delta, latitude + lat_delta, longitude + lon_delta, allowed):
+                location = self._cache[user_id]
+                distance = haversine_km(latitude, longitude, location["latitude"], location["longitude"])
+                if distance <= radius_km:
+                    matches.append((distance, user_id, location))
+
+        matches.sort(key=lambda match: match[0])
+        return {
+            user_id: {**self._with_online_status(location, current_time), "distance_km": round(distance, 3)}
+            for distance, user_id, location in matches
+        }
+
     def remove_user(self, user_id: int):
         """Remove user from cache"""
         with self._lock:
             self._cache.pop(user_id, None)
+            cell = self._cell_by_user.pop(user_id, None)
+            if cell is not None:
+                self._remove_from_cell(user_id, cell)
 
     def cleanup_offline_users(self, hours: int = 24):
         """Remove users who haven't updated location in specified hours"""
@@ -59,8 +135,47 @@ class LocationCache:
             
             for user_id in offline_users:
                 del self._cache[user_id]
+                self._remove_from_cell(user_id, self._cell_by_user.pop(user_id))
             
             return len(offline_users)
 
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return math.floor(latitude / self.GRID_CELL_DEGREES), math.floor(longitude / self.GRID_CELL_DEGREES)
+
+    def _remove_from_cell(self, user_id: int, cell: Tuple[int, int]):
+        users = self._cells.get(cell)
+        if users is not None:
+            users.discard(user_id)
+            if not users:
+                del self._cells[cell]
+
+    def _candidates(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float, allowed: Optional[Set[int]]) -> Iterable[int]:
+        """Users in the grid cells overlapping the box (a superset of the box); callers check exact bounds"""
+        low_lat, low_lon = self._cell(min_lat, min_lon)
+        high_lat, high_lon = self._cell(max_lat, max_lon)
+        cell_count = (high_lat - low_lat + 1) * (high_lon - low_lon + 1)
+
+        # A box wider than the occupied grid is cheaper to answer from the occupied cells or the allowed users
+        if allowed is not None and len(allowed) <= min(cell_count, len(self._cells)):
+            return [user_id for user_id in allowed if user_id in self._cache]
+        if cell_count > len(self._cells):
+            cells = [
+                users for (cell_lat, cell_lon), users in self._cells.items()
+                if low_lat <= cell_lat <= high_lat and low_lon <= cell_lon <= high_lon
+            ]
+        else:
+            cells = [
+                self._cells[(cell_lat, cell_lon)]
+                for cell_lat in range(low_lat, high_lat + 1)
+                for cell_lon in range(low_lon, high_lon + 1)
+                if (cell_lat, cell_lon) in self._cells
+            ]
+        return [user_id for users in cells for user_id in users if allowed is None or user_id in allowed]
+
+    def _with_online_status(self, location: dict, current_time: datetime) -> dict:
+        location_copy = location.copy()
+        location_copy["is_online"] = (current_time - location["last_updated"]).total_seconds() < (self.ONLINE_THRESHOLD_MINUTES * 60)
+        return location_copy
+
 # Global cache instance
 location_cache = LocationCache()
\ No newline at end of file
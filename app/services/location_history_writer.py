@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Optional
+from psycopg2.extras import execute_values
+from app.core.config import settings
+from app.services.batch_writer import BatchWriter
+
+class LocationHistoryWriter(BatchWriter):
+    """Buffers user_locations rows from location pings and writes them in batches from a background thread"""
+
+    name = "Location history writer"
+
+    def __init__(
+        self,
+        max_queue_size: int = settings.LOCATION_HISTORY_QUEUE_SIZE,
+        batch_size: int = settings.LOCATION_HISTORY_BATCH_SIZE,
+        flush_interval: float = settings.LOCATION_HISTORY_FLUSH_INTERVAL
+    ):
+        super().__init__(max_queue_size, batch_size, flush_interval)
+
+    def enqueue(self, user_id: int, latitude: float, longitude: float, accuracy: Optional[float] = None) -> bool:
+        """Queue a ping without blocking; the row is dropped and counted when the queue is full"""
+        return self._put((user_id, latitude, longitude, accuracy, datetime.now()))
+
+    def write_batch(self, cursor, batch) -> int:
+        # Pings from users deleted since they were queued are skipped instead of failing the batch
+        execute_values(
+            cursor,
+            """
+            INSERT INTO user_locations (user_id, latitude, longitude, accuracy, created_at)
+            SELECT v.user_id, v.latitude, v.longitude, v.accuracy, v.created_at
+            FROM (VALUES %s) AS v(user_id, latitude, longitude, accuracy, created_at)
+            WHERE EXISTS (SELECT 1 FROM users u WHERE u.user_id = v.user_id)
+            """,
+            batch,
+            template="(%s::int, %s::numeric, %s::numeric, %s::float, %s::timestamp)",
+            page_size=len(batch)
+        )
+        return cursor.rowcount
+
+    def render_prometheus(self) -> str:
+        stats = self.get_stats()
+        lines = [
+            "# HELP loksetu_location_history_queue_depth Location pings waiting to be written.",
+            "# TYPE loksetu_location_history_queue_depth gauge",
+            f"loksetu_location_history_queue_depth {stats['queue_depth']}",
+            "# HELP loksetu_location_history_rows_total Location history rows, by outcome.",
+            "# TYPE loksetu_location_history_rows_total counter"
+        ]
+        for outcome in ("written", "dropped", "failed", "skipped"):
+            lines.append(f'loksetu_location_history_rows_total{{outcome="{outcome}"}} {stats[outcome]}')
+        lines += [
+            "# HELP loksetu_location_history_flush_seconds Time spent writing location history batches.",
+            "# TYPE loksetu_location_history_flush_seconds summary",
+            f"loksetu_location_history_flush_seconds_sum {stats['flush_seconds_total']:.6f}",
+            f"loksetu_location_history_flush_seconds_count {stats['flushes']}"
+        ]
+        return "\n".join(lines) + "\n"
+
+# Global location history writer instance
+location_history_writer = LocationHistoryWriter()
@@ -1,8 +1,10 @@
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Set
 from datetime import datetime, timedelta
 from app.data.connection import get_db_connection
 from app.models.location import UserLocation
 from app.services.location_cache import location_cache
+from app.services.location_history_writer import location_history_writer
+from app.services.user_hierarchy import user_hierarchy
 from app.utils.logger import logger
 
 class LocationService:
@@ -10,19 +12,10 @@ class LocationService:
         self.cache = location_cache
 
     def update_user_location(self, user_id: int, latitude: float, longitude: float, accuracy: Optional[float] = None):
-        """Update user location in both database and cache"""
-        # Store in database for history
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO user_locations (user_id, latitude, longitude, accuracy) VALUES (%s, %s, %s, %s)",
-                (user_id, latitude, longitude, accuracy)
-            )
-            conn.commit()
-
-        # Update cache for real-time access
+        """Update the cache right away and queue the ping for the batched history writer"""
         self.cache.update_location(user_id, latitude, longitude, accuracy)
-        logger.info(f"Updated location for user {user_id}")
+        location_history_writer.enqueue(user_id, latitude, longitude, accuracy)
+        logger.debug(f"Updated location for user {user_id}")
 
     def get_user_latest_location(self, user_id: int) -> Optional[dict]:
         """Get user's latest location from cache"""
@@ -49,32 +42,21 @@ class LocationService:
     def get_subordinate_locations(self, supervisor_user: dict) -> Dict[int, dict]:
         """Get locations of users under supervisor's hierarchy"""
         subordinate_ids = self._get_subordinate_user_ids(supervisor_user)
-        
-        all_locations = self.cache.get_all_locations()
-       
-        # Filter only subordinate locations
-        return {
-            user_id: location for user_id, location in all_locations.items()
-            if user_id in subordinate_ids
-        }
+        return self.cache.get_locations(subordinate_ids)
 
-    def _get_subordinate_user_ids(self, supervisor_user: dict) -> List[int]:
-        """Get list of user IDs that supervisor can monitor"""
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            if supervisor_user['role'] == 'super_admin':
-                # Super admin can see all users
-                cursor.execute("SELECT user_id FROM users WHERE is_active = true")
-            elif supervisor_user['role'] == 'admin':
-                # Admin can see users they created
-                cursor.execute("SELECT user_id FROM users WHERE created_by = %s AND is_active = true", 
-                             (supervisor_user['user_id'],))
-            else:
-                # Booth boys and candidates can't monitor others
-                return []
-            
-            return [row[0] for row in cursor.fetchall()]
+    def get_subordinate_locations_in_bbox(self, supervisor_user: dict, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> Dict[int, dict]:
+        """Get locations of the supervisor's subordinates inside a map viewport"""
+        subordinate_ids = self._get_subordinate_user_ids(supervisor_user)
+        return self.cache.get_locations_in_bbox(min_lat, min_lon, max_lat, max_lon, subordinate_ids)
+
+    def get_subordinate_locations_within(self, supervisor_user: dict, latitude: float, longitude: float, radius_km: float) -> Dict[int, dict]:
+        """Get locations of the supervisor's subordinates within radius_km of a point, nearest first"""
+        subordinate_ids = self._get_subordinate_user_ids(supervisor_user)
+        return self.cache.get_locations_within(latitude, longitude, radius_km, subordinate_ids)
+
+    def _get_subordinate_user_ids(self, supervisor_user: dict) -> Set[int]:
+        """Get IDs of the users that supervisor can monitor"""
+        return user_hierarchy.get_subordinate_ids(supervisor_user)
 
     def get_user_info_with_location(self, user_ids: List[int]) -> List[dict]:
         """Get user info combined with their latest location"""
@@ -0,0 +1,193 @@
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Tuple
+
+# Log-bucketed latency: each bucket is ~8% wider than the previous, so
+# percentiles are accurate to a few percent from 0.1 ms up to minutes.
+LATENCY_MIN_MS = 0.1
+LATENCY_BUCKET_GROWTH = 1.08
+_LOG_GROWTH = math.log(LATENCY_BUCKET_GROWTH)
+
+# Rolling windows are built from fixed time slices
+SLICE_SECONDS = 10
+WINDOWS = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600}
+MAX_WINDOW_SLICES = max(WINDOWS.values()) // SLICE_SECONDS
+
+# Cumulative buckets (seconds) for the Prometheus histogram
+PROMETHEUS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Requests that matched no route share one label to bound cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+def _bucket_index(duration_ms: float) -> int:
+    if duration_ms <= LATENCY_MIN_MS:
+        return 0
+    return int(math.ceil(math.log(duration_ms / LATENCY_MIN_MS) / _LOG_GROWTH))
+
+def _bucket_upper_ms(index: int) -> float:
+    return LATENCY_MIN_MS * LATENCY_BUCKET_GROWTH ** index
+
+class LatencyHistogram:
+    """Sparse log-bucketed latency histogram with request and error counts"""
+    __slots__ = ("count", "error_count", "sum_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.error_count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets: Dict[int, int] = {}
+
+    def record(self, duration_ms: float, is_error: bool):
+        self.count += 1
+        self.sum_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        if is_error:
+            self.error_count += 1
+        index = _bucket_index(duration_ms)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: "LatencyHistogram"):
+        self.count += other.count
+        self.error_count += other.error_count
+        self.sum_ms += other.sum_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def percentile(self, quantile: float) -> float:
+        """Upper bound of the bucket holding the quantile, capped at the observed max"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(quantile * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(_bucket_upper_ms(index), self.max_ms)
+        return self.max_ms
+
+class RouteMetrics:
+    """Rolling time slices plus cumulative counters for one method and route template"""
+
+    def __init__(self):
+        self.slices: "deque[Tuple[int, LatencyHistogram]]" = deque()
+        self.status_counts: Dict[int, int] = {}
+        self.bucket_counts = [0] * len(PROMETHEUS_BUCKETS)
+        self.total_count = 0
+        self.total_seconds = 0.0
+
+    def record(self, slice_id: int, status_code: int, duration_ms: float):
+        if not self.slices or self.slices[-1][0] != slice_id:
+            self.slices.append((slice_id, LatencyHistogram()))
+            while self.slices[0][0] <= slice_id - MAX_WINDOW_SLICES:
+                self.slices.popleft()
+        self.slices[-1][1].record(duration_ms, status_code >= 400)
+
+        self.status_counts[status_code] = self.status_counts.get(status_code, 0) + 1
+        self.total_count += 1
+        self.total_seconds += duration_ms / 1000
+        for position, bound in enumerate(PROMETHEUS_BUCKETS):
+            if duration_ms / 1000 <= bound:
+                self.bucket_counts[position] += 1
+
+    def window(self, slice_id: int, window_slices: int) -> LatencyHistogram:
+        merged = LatencyHistogram()
+        for started, histogram in self.slices:
+            if started > slice_id - window_slices:
+                merged.merge(histogram)
+        return merged
+
+class MetricsRegistry:
+    """In-process request metrics fed by APIMonitoringMiddleware"""
+
+    def __init__(self):
+        self._routes: Dict[Tuple[str, str], RouteMetrics] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def record(self, method: str, route: str, status_code: int, duration_ms: float):
+        slice_id = int(time.time() // SLICE_SECONDS)
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = RouteMetrics()
+            metrics.record(slice_id, status_code, duration_ms)
+
+    def snapshot(self, window: str = "5m") -> List[Dict]:
+        """Per-route counts, error rate and latency percentiles over a rolling window"""
+        window_seconds = WINDOWS[window]
+        # Early in the process lifetime the window is only partly filled
+        elapsed_seconds = max(1.0, min(window_seconds, time.time() - self.started_at))
+        slice_id = int(time.time() // SLICE_SECONDS)
+        results = []
+        with self._lock:
+            for (method, route), metrics in self._routes.items():
+                histogram = metrics.window(slice_id, window_seconds // SLICE_SECONDS)
+                if not histogram.count:
+                    continue
+                results.append({
+                    "method": method,
+                    "route": route,
+                    "request_count": histogram.count,
+                    "error_count": histogram.error_count,
+                    "error_rate": round(histogram.error_count * 100.0 / histogram.count, 2),
+                    "requests_per_second": round(histogram.count / elapsed_seconds, 3),
+                    "avg_ms": round(histogram.sum_ms / histogram.count, 2),
+                    "p50_ms": round(histogram.percentile(0.50), 2),
+                    "p95_ms": round(histogram.percentile(0.95), 2),
+                    "p99_ms": round(histogram.percentile(0.99), 2),
+                    "max_ms": round(histogram.max_ms, 2)
+                })
+        results.sort(key=lambda r: r["request_count"], reverse=True)
+        return results
+
+    def render_prometheus(self, window: str = "5m") -> str:
+        """Prometheus text exposition (format 0.0.4) of the cumulative and windowed metrics"""
+        slice_id = int(time.time() // SLICE_SECONDS)
+        lines = [
+            "# HELP loksetu_http_requests_total Requests handled, by route template and status code.",
+            "# TYPE loksetu_http_requests_total counter"
+        ]
+        with self._lock:
+            routes = sorted(self._routes.items())
+            for (method, route), metrics in routes:
+                for status_code, count in sorted(metrics.status_counts.items()):
+                    lines.append(
+                        f'loksetu_http_requests_total{{method="{method}",route="{_escape(route)}",status="{status_code}"}} {count}'
+                    )
+
+            lines += [
+                "# HELP loksetu_http_request_duration_seconds Request latency, by route template.",
+                "# TYPE loksetu_http_request_duration_seconds histogram"
+            ]
+            for (method, route), metrics in routes:
+                labels = f'method="{method}",route="{_escape(route)}"'
+                for bound, count in zip(PROMETHEUS_BUCKETS, metrics.bucket_counts):
+                    lines.append(f'loksetu_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'loksetu_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {metrics.total_count}')
+                lines.append(f"loksetu_http_request_duration_seconds_sum{{{labels}}} {metrics.total_seconds:.6f}")
+                lines.append(f"loksetu_http_request_duration_seconds_count{{{labels}}} {metrics.total_count}")
+
+            lines += [
+                f"# HELP loksetu_http_request_duration_window_seconds Latency quantiles over the last {window}.",
+                "# TYPE loksetu_http_request_duration_window_seconds gauge"
+            ]
+            for (method, route), metrics in routes:
+                histogram = metrics.window(slice_id, WINDOWS[window] // SLICE_SECONDS)
+                if not histogram.count:
+                    continue
+                labels = f'method="{method}",route="{_escape(route)}",window="{window}"'
+                for quantile in (0.5, 0.95, 0.99):
+                    value = histogram.percentile(quantile) / 1000
+                    lines.append(f'loksetu_http_request_duration_window_seconds{{{labels},quantile="{quantile}"}} {value:.6f}')
+
+        return "\n".join(lines) + "\n"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# Global metrics registry instance
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+import threading
+import time
+from app.core.config import settings
+
+class PrincipalCache:
+    """Bounded LRU cache of authenticated users keyed by token subject (username)"""
+
+    def __init__(self, ttl_seconds: int = settings.PRINCIPAL_CACHE_TTL, max_size: int = settings.PRINCIPAL_CACHE_MAX_SIZE):
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._usernames_by_id: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+
+    def get(self, username: str) -> Optional[dict]:
+        """Get cached user, or None if missing or expired"""
+        with self._lock:
+            entry = self._cache.get(username)
+            if not entry:
+                return None
+
+            user, cached_at = entry
+            if time.monotonic() - cached_at > self.ttl_seconds:
+                self._remove(username)
+                return None
+
+            self._cache.move_to_end(username)
+            # Hand out a copy so callers can't mutate the cached principal
+            return dict(user)
+
+    def set(self, username: str, user: dict):
+        """Cache user for username, evicting least recently used entries"""
+        with self._lock:
+            self._remove(username)
+            user_id = user.get("user_id")
+            if user_id is not None:
+                # A renamed user must not stay cached under the old username
+                previous_username = self._usernames_by_id.get(user_id)
+                if previous_username is not None:
+                    self._remove(previous_username)
+                self._usernames_by_id[user_id] = username
+            self._cache[username] = (dict(user), time.monotonic())
+
+            while len(self._cache) > self.max_size:
+                oldest_username = next(iter(self._cache))
+                self._remove(oldest_username)
+
+    def invalidate(self, username: str):
+        """Drop cached entry for username"""
+        with self._lock:
+            self._remove(username)
+
+    def invalidate_user_id(self, user_id: int):
+        """Drop cached entry for user_id (username may have changed)"""
+        with self._lock:
+            username = self._usernames_by_id.get(user_id)
+            if username is not None:
+                self._remove(username)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._usernames_by_id.clear()
+
+    def _remove(self, username: str):
+        entry = self._cache.pop(username, None)
+        if entry:
+            self._usernames_by_id.pop(entry[0].get("user_id"), None)
+
+# Global cache instance
+principal_cache = PrincipalCache()
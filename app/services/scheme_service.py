@@ -1,6 +1,7 @@
 from typing import List, Optional
 from app.models.scheme import Scheme
 from app.data.postgres_adapter import PostgresAdapter
+from app.services.voter_list_cache import voter_list_cache
 from app.utils.logger import logger
 
 class SchemeService:
@@ -49,6 +50,7 @@ class SchemeService:
         # Update voter-scheme relationships
         success = self.adapter.update_voter_schemes(voter_epic, scheme_ids, user['user_id'])
         if success:
+            voter_list_cache.invalidate([voters[0]['booth_id']])
             logger.info(f"Updated schemes for voter {voter_epic}: {scheme_ids}")
         return success
 
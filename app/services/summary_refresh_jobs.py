@@ -0,0 +1,165 @@
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from app.core.config import settings
+from app.data.connection import POOL_MAX_CONNECTIONS
+from app.data.postgres_adapter import PostgresAdapter
+from app.services.booth_summary_service import BoothSummaryService
+from app.utils.logger import logger
+
+class SummaryRefreshJob:
+    """Progress of one background booth summary refresh"""
+
+    def __init__(self, booth_ids: List[int], requested_by: Optional[int], coalesced_job_ids: List[str]):
+        self.job_id = uuid.uuid4().hex
+        self.booth_ids = booth_ids
+        self.requested_by = requested_by
+        # Everyone who was handed this job, including requests coalesced onto it
+        self.requesters: Set[int] = {requested_by} if requested_by is not None else set()
+        # In-flight jobs already refreshing some of the requested booths
+        self.coalesced_job_ids = coalesced_job_ids
+        self.status = "queued"
+        self.pending_batches = 0
+        self.completed_booths = 0
+        self.failed_booths = 0
+        self.errors: List[str] = []
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+class SummaryRefreshJobManager:
+    """Runs booth summary refreshes in batches on a worker pool bounded by the DB pool"""
+
+    def __init__(self):
+        self.booth_summary_service = BoothSummaryService(PostgresAdapter())
+        self.batch_size = BoothSummaryService.REFRESH_BATCH_SIZE
+        # Leave half of the pool for request handling
+        self.max_workers = max(1, min(settings.SUMMARY_REFRESH_WORKERS, POOL_MAX_CONNECTIONS // 2))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="summary-refresh")
+        self._jobs: Dict[str, SummaryRefreshJob] = {}
+        self._in_flight: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, booth_ids: List[int], requested_by: Optional[int] = None) -> Dict:
+        """Queue a refresh for booth_ids, reusing in-flight jobs for booths already being refreshed"""
+        with self._lock:
+            self._prune_finished_jobs()
+
+            requested = list(dict.fromkeys(booth_ids or []))
+            covering_job_ids = sorted({self._in_flight[b] for b in requested if b in self._in_flight})
+            pending = [b for b in requested if b not in self._in_flight]
+
+            if requested_by is not None:
+                for job_id in covering_job_ids:
+                    self._jobs[job_id].requesters.add(requested_by)
+
+            if requested and not pending and len(covering_job_ids) == 1:
+                return self._job_to_dict(self._jobs[covering_job_ids[0]])
+
+            job = SummaryRefreshJob(pending, requested_by, covering_job_ids)
+            self._jobs[job.job_id] = job
+
+            batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+            if not batches:
+                job.status = "completed"
+                job.finished_at = datetime.now()
+
+            job.pending_batches = len(batches)
+            for booth_id in pending:
+                self._in_flight[booth_id] = job.job_id
+            for batch in batches:
+                self._executor.submit(self._run_batch, job, batch)
+
+            logger.info(f"Queued summary refresh job {job.job_id} for {len(pending)} booths in {len(batches)} batches")
+            return self._job_to_dict(job)
+
+    def get_job(self, job_id: str, user_id: Optional[int] = None, assigned_booths: Optional[List[int]] = None) -> Optional[Dict]:
+        """Job progress; with user_id, None unless the user requested the job or is assigned all of its booths"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return None
+            if user_id is not None and user_id not in job.requesters and not (
+                job.booth_ids and set(job.booth_ids) <= set(assigned_booths or [])
+            ):
+                return None
+            return self._job_to_dict(job)
+
+    def shutdown(self):
+        """Stop accepting work and drop batches that have not started"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run_batch(self, job: SummaryRefreshJob, batch: List[int]):
+        with self._lock:
+            if job.status == "queued":
+                job.status = "running"
+                job.started_at = datetime.now()
+
+        error = None
+        try:
+            self.booth_summary_service.refresh_booth_batch(batch)
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Summary refresh job {job.job_id} failed for booths {batch[0]}-{batch[-1]}: {e}")
+
+        with self._lock:
+            if error:
+                job.failed_booths += len(batch)
+                job.errors.append(error)
+            else:
+                job.completed_booths += len(batch)
+
+            for booth_id in batch:
+                if self._in_flight.get(booth_id) == job.job_id:
+                    del self._in_flight[booth_id]
+
+            job.pending_batches -= 1
+            if job.pending_batches == 0:
+                job.status = "failed" if job.failed_booths else "completed"
+                job.finished_at = datetime.now()
+                logger.info(f"Summary refresh job {job.job_id} {job.status}: {job.completed_booths} booths refreshed")
+
+    def _job_to_dict(self, job: SummaryRefreshJob) -> Dict:
+        statuses = [job.status] + [
+            self._jobs[job_id].status for job_id in job.coalesced_job_ids if job_id in self._jobs
+        ]
+        if "running" in statuses:
+            status = "running"
+        elif "queued" in statuses:
+            status = "queued"
+        elif "failed" in statuses:
+            status = "failed"
+        else:
+            status = "completed"
+
+        return {
+            "job_id": job.job_id,
+            "status": status,
+            "requested_by": job.requested_by,
+            "total_booths": len(job.booth_ids),
+            "completed_booths": job.completed_booths,
+            "failed_booths": job.failed_booths,
+            "coalesced_job_ids": job.coalesced_job_ids,
+            "errors": job.errors,
+            "created_at": job.created_at.isoformat(),
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None
+        }
+
+    def _prune_finished_jobs(self):
+        now = datetime.now()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.is_finished and (now - job.finished_at).total_seconds() > settings.SUMMARY_REFRESH_JOB_RETENTION
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+# Global refresh job manager instance
+summary_refresh_jobs = SummaryRefreshJobManager()
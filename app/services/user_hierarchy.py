@@ -0,0 +1,175 @@
+import threading
+import time
+from typing import Dict, List, Optional, Set
+from app.core.config import settings
+from app.data.connection import get_db_connection
+from app.utils.logger import logger
+
+class UserHierarchyIndex:
+    """In-memory closure of the users.created_by tree.
+
+    Built from the users table on first use and kept current by UserService on
+    create / update / delete. Descendant sets are precomputed per user, so
+    resolving someone's subordinates costs O(result) instead of a users query.
+    Edits made by other processes are picked up by a full reload every
+    USER_HIERARCHY_REFRESH_SECONDS.
+    """
+
+    def __init__(self, refresh_seconds: int = settings.USER_HIERARCHY_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.RLock()
+        self._loaded_at = None
+        self._parent: Dict[int, Optional[int]] = {}
+        self._children: Dict[int, Set[int]] = {}
+        self._descendants: Dict[int, Set[int]] = {}
+        self._active: Set[int] = set()
+        self._ids_by_username: Dict[str, int] = {}
+
+    def get_subordinate_ids(self, user: dict) -> Set[int]:
+        """Active user IDs the user may monitor: everyone for super_admin, the created_by subtree for admin"""
+        with self._lock:
+            self._ensure_loaded()
+            if user['role'] == 'super_admin':
+                return set(self._active)
+            if user['role'] == 'admin':
+                return self._descendants.get(user['user_id'], set()) & self._active
+            # Booth boys and candidates can't monitor others
+            return set()
+
+    def get_children(self, user_id: int) -> Set[int]:
+        """IDs of the users created directly by user_id"""
+        with self._lock:
+            self._ensure_loaded()
+            return set(self._children.get(user_id, ()))
+
+    def get_descendants(self, user_id: int) -> Set[int]:
+        with self._lock:
+            self._ensure_loaded()
+            return set(self._descendants.get(user_id, ()))
+
+    def get_ancestors(self, user_id: int) -> List[int]:
+        """Creators of user_id, nearest first"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._ancestors(user_id)
+
+    def get_user_id(self, username: str) -> Optional[int]:
+        with self._lock:
+            self._ensure_loaded()
+            return self._ids_by_username.get(username)
+
+    def add_user(self, user_id: int, username: str, created_by: Optional[int] = None, is_active: bool = True):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._add(user_id, username, created_by, is_active)
+
+    def update_user(self, user_id: int, updates: dict):
+        """Apply the created_by / username / is_active parts of a users row update"""
+        with self._lock:
+            if self._loaded_at is None or user_id not in self._parent:
+                return
+            if 'username' in updates:
+                for username, known_id in list(self._ids_by_username.items()):
+                    if known_id == user_id:
+                        del self._ids_by_username[username]
+                self._ids_by_username[updates['username']] = user_id
+            if 'is_active' in updates:
+                if updates['is_active']:
+                    self._active.add(user_id)
+                else:
+                    self._active.discard(user_id)
+            if 'created_by' in updates and updates['created_by'] != self._parent[user_id]:
+                self._move(user_id, updates['created_by'])
+
+    def remove_user(self, user_id: int):
+        with self._lock:
+            if self._loaded_at is None or user_id not in self._parent:
+                return
+            # Users it created stay, as roots of their own subtrees
+            for child_id in list(self._children.get(user_id, ())):
+                self._move(child_id, None)
+            self._move(user_id, None)
+            self._parent.pop(user_id)
+            self._children.pop(user_id, None)
+            self._descendants.pop(user_id, None)
+            self._active.discard(user_id)
+            for username, known_id in list(self._ids_by_username.items()):
+                if known_id == user_id:
+                    del self._ids_by_username[username]
+
+    def invalidate(self):
+        """Drop the index; the next lookup reloads it"""
+        with self._lock:
+            self._loaded_at = None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "loaded": self._loaded_at is not None,
+                "users": len(self._parent),
+                "active_users": len(self._active),
+                "age_seconds": round(time.monotonic() - self._loaded_at, 1) if self._loaded_at is not None else None
+            }
+
+    def _ensure_loaded(self):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self._load()
+
+    def _load(self):
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT user_id, username, created_by, is_active FROM users")
+            rows = cursor.fetchall()
+
+        self._parent, self._children, self._descendants = {}, {}, {}
+        self._active, self._ids_by_username = set(), {}
+        for user_id, username, created_by, is_active in rows:
+            self._parent[user_id] = None
+            self._ids_by_username[username] = user_id
+            if is_active:
+                self._active.add(user_id)
+        # Link in a second pass so creators listed after their users are known
+        for user_id, _, created_by, _ in rows:
+            if created_by is not None and created_by in self._parent:
+                self._move(user_id, created_by)
+
+        self._loaded_at = time.monotonic()
+        logger.info(f"Loaded user hierarchy: {len(self._parent)} users")
+
+    def _add(self, user_id: int, username: str, created_by: Optional[int], is_active: bool):
+        self._parent.setdefault(user_id, None)
+        self._ids_by_username[username] = user_id
+        if is_active:
+            self._active.add(user_id)
+        if created_by is not None and created_by in self._parent:
+            self._move(user_id, created_by)
+
+    def _ancestors(self, user_id: int) -> List[int]:
+        ancestors, parent = [], self._parent.get(user_id)
+        while parent is not None and parent not in ancestors:
+            ancestors.append(parent)
+            parent = self._parent.get(parent)
+        return ancestors
+
+    def _move(self, user_id: int, new_parent: Optional[int]):
+        """Re-hang user_id and its subtree under new_parent, keeping every ancestor's descendant set exact"""
+        if new_parent is not None and (new_parent == user_id or new_parent in self._descendants.get(user_id, ())):
+            logger.error(f"Ignoring created_by cycle: user {user_id} under {new_parent}")
+            return
+
+        subtree = {user_id} | self._descendants.get(user_id, set())
+        old_parent = self._parent.get(user_id)
+        if old_parent is not None:
+            self._children[old_parent].discard(user_id)
+            for ancestor in [old_parent] + self._ancestors(old_parent):
+                self._descendants[ancestor] -= subtree
+
+        self._parent[user_id] = new_parent
+        if new_parent is not None:
+            self._children.setdefault(new_parent, set()).add(user_id)
+            for ancestor in [new_parent] + self._ancestors(new_parent):
+                self._descendants.setdefault(ancestor, set()).update(subtree)
+
+# Global user hierarchy instance
+user_hierarchy = UserHierarchyIndex()
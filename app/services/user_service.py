@@ -1,15 +1,28 @@
 from app.data.postgres_adapter import PostgresAdapter
+from app.data.async_postgres_adapter import AsyncPostgresAdapter
 from app.models.user import User
 from app.core.security import verify_password
 from app.data.excel_cache import ExcelCache
 from app.utils.logger import logger
+from app.services.principal_cache import principal_cache
+from app.services.user_hierarchy import user_hierarchy
 
 class UserService:
     def __init__(self, constituency_file=None):
         self.adapter = PostgresAdapter(constituency_file)
+        self.async_adapter = AsyncPostgresAdapter()
 
     def get_user_by_username(self, username: str):
         return self.adapter.get_user_by_username(username)
+
+    async def get_principal(self, username: str):
+        """Get user for an authenticated token subject, served from the principal cache"""
+        user = principal_cache.get(username)
+        if user is None:
+            user = await self.async_adapter.get_user_by_username(username)
+            if user:
+                principal_cache.set(username, user)
+        return user
     
     def authenticate_user(self, username: str, password: str):
         user = self.adapter.get_user_by_username(username)
@@ -22,28 +35,32 @@ class UserService:
         return self.adapter.get_user_by_mobile(mobile)
 
     def get_users_created_by(self, creator_username: str):
-        users = self.adapter.get_users()
+        creator_id = user_hierarchy.get_user_id(creator_username)
+        created_ids = user_hierarchy.get_children(creator_id) if creator_id is not None else set()
+        if not created_ids:
+            return []
+
+        users = self.adapter.get_users_by_ids(sorted(created_ids))
         created_users = []
         for u in users:
-            if u.get("created_by") == creator_username:
-                created_users.append({
-                    "user_id": u["user_id"],
-                    "username": u["username"],
-                    "full_name": u.get("full_name"),
-                    "role": u["role"],
-                    "phone": u.get("phone"),
-                    "email": u.get("email"),
-                    "assigned_booths": u["assigned_booths"],
-                    "assigned_constituencies": u.get("assigned_constituencies", ""),
-                    "assigned_blocks": u.get("assigned_blocks", []),
-                    "assigned_panchayats": u.get("assigned_panchayats", []),
-                    "district_id": u.get("district_id"),
-                    "state_id": u.get("state_id"),
-                    "party_id": u.get("party_id"),
-                    "alliance_id": u.get("alliance_id"),
-                    "party_name": u.get("party_name"),
-                    "alliance_name": u.get("alliance_name")
-                })
+            created_users.append({
+                "user_id": u["user_id"],
+                "username": u["username"],
+                "full_name": u.get("full_name"),
+                "role": u["role"],
+                "phone": u.get("phone"),
+                "email": u.get("email"),
+                "assigned_booths": u["assigned_booths"],
+                "assigned_constituencies": u.get("assigned_constituencies", ""),
+                "assigned_blocks": u.get("assigned_blocks", []),
+                "assigned_panchayats": u.get("assigned_panchayats", []),
+                "district_id": u.get("district_id"),
+                "state_id": u.get("state_id"),
+                "party_id": u.get("party_id"),
+                "alliance_id": u.get("alliance_id"),
+                "party_name": u.get("party_name"),
+                "alliance_name": u.get("alliance_name")
+            })
         return created_users
 
     def get_all_users(self):
@@ -99,13 +116,23 @@ class UserService:
     def create_user(self, username, role, full_name, phone, email, assigned_booths, assigned_constituencies, password_hash, created_by, party_id=None, alliance_id=None, assigned_blocks="", assigned_panchayats="", district_id=None, state_id=None):
         user_data = (username, role, full_name, phone, assigned_booths, password_hash, email, created_by, assigned_constituencies, party_id, alliance_id, assigned_blocks, assigned_panchayats, district_id, state_id)
         created_user = self.adapter.create_user(user_data)
+        if created_user:
+            user_hierarchy.add_user(created_user["user_id"], created_user["username"], created_user.get("created_by"), created_user.get("is_active", True))
         return created_user
     
     def update_user(self, user_id, updates):
-        return self.adapter.update_user(user_id, updates)
+        # The adapter pops the assignment fields out of updates
+        hierarchy_updates = {field: updates[field] for field in ("username", "created_by", "is_active") if field in updates}
+        result = self.adapter.update_user(user_id, updates)
+        principal_cache.invalidate_user_id(user_id)
+        user_hierarchy.update_user(user_id, hierarchy_updates)
+        return result
     
     def delete_user(self, user_id):
-        return self.adapter.delete_user(user_id)
+        result = self.adapter.delete_user(user_id)
+        principal_cache.invalidate_user_id(user_id)
+        user_hierarchy.remove_user(user_id)
+        return result
     
     def get_user_by_id(self, user_id):
         return self.adapter.get_user_by_id(user_id)
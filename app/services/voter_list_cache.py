@@ -0,0 +1,134 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, Tuple
+from app.core.config import settings
+
+class VoterListCache:
+    """Byte-bounded LRU of serialized per-booth voter lists with single-flight loading.
+
+    Entries are stored with the booth's data version (see get_voter_list_versions) and
+    only served for the same version, so writes made by other processes are never hidden.
+    Writes in this process also invalidate the booth right away to free the memory.
+    """
+
+    def __init__(self, max_bytes: int = settings.VOTER_LIST_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[int, Tuple[Hashable, bytes]]" = OrderedDict()
+        self._loading: Dict[Tuple[int, Hashable], asyncio.Future] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def get(self, booth_id: int, version: Hashable, load: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Cached body for booth_id at version; concurrent misses share one load"""
+        with self._lock:
+            entry = self._entries.get(booth_id)
+            if entry and entry[0] == version:
+                self._entries.move_to_end(booth_id)
+                self.hits += 1
+                return entry[1]
+
+            key = (booth_id, version)
+            future = self._loading.get(key)
+            is_leader = future is None
+            if is_leader:
+                self.misses += 1
+                future = self._loading[key] = asyncio.get_running_loop().create_future()
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            try:
+                # Shielded so one cancelled waiter doesn't cancel the load for the others
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader's request was cancelled mid-load
+                return await load()
+
+        try:
+            body = await load()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved; the leader raises it itself
+            future.exception()
+            raise
+        else:
+            future.set_result(body)
+            self._store(booth_id, version, body)
+            return body
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+
+    def invalidate(self, booth_ids: Iterable[int]):
+        """Drop the cached lists of booths whose voters were just written"""
+        with self._lock:
+            for booth_id in booth_ids:
+                entry = self._entries.pop(booth_id, None)
+                if entry:
+                    self._size -= len(entry[1])
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round((self.hits + self.coalesced) * 100.0 / lookups, 2) if lookups else 0.0
+            }
+
+    def render_prometheus(self) -> str:
+        stats = self.get_stats()
+        lines = [
+            "# HELP loksetu_voter_list_cache_requests_total Voter list cache lookups, by result.",
+            "# TYPE loksetu_voter_list_cache_requests_total counter"
+        ]
+        for result in ("hits", "misses", "coalesced"):
+            lines.append(f'loksetu_voter_list_cache_requests_total{{result="{result}"}} {stats[result]}')
+        lines += [
+            "# HELP loksetu_voter_list_cache_bytes Serialized voter lists held in memory.",
+            "# TYPE loksetu_voter_list_cache_bytes gauge",
+            f"loksetu_voter_list_cache_bytes {stats['size_bytes']}"
+        ]
+        return "\n".join(lines) + "\n"
+
+    def _store(self, booth_id: int, version: Hashable, body: bytes):
+        # A list bigger than the whole budget would only evict everything else
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(booth_id, None)
+            if previous:
+                self._size -= len(previous[1])
+            self._entries[booth_id] = (version, body)
+            self._size += len(body)
+
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+# Global voter list cache instance
+voter_list_cache = VoterListCache()
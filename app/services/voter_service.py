@@ -1,50 +1,255 @@
+import asyncio
+from datetime import datetime
 from app.data.postgres_adapter import PostgresAdapter
-from app.models.voter import Voter
+from app.data.async_postgres_adapter import AsyncPostgresAdapter
+from app.models.voter import Voter, VoterRow
+from app.schemas.voter_schema import VoterResponse
+from app.core.config import settings
 from app.utils.logger import logger
+from app.utils.helpers import dumps_json, version_etag, encode_cursor, decode_cursor
 from app.services.booth_summary_service import BoothSummaryService
+from app.services.summary_refresh_jobs import summary_refresh_jobs
+from app.services.voter_list_cache import voter_list_cache
 
 class VoterService:
+    # Keys and order of the documented VoterResponse contract
+    VOTER_RESPONSE_FIELDS = tuple(VoterResponse.model_fields)
+
     def __init__(self, constituency_file=None):
         self.adapter = PostgresAdapter(constituency_file)
+        self.async_adapter = AsyncPostgresAdapter()
         self.booth_summary_service = BoothSummaryService(self.adapter)
 
-    def search_voters(self, booth_ids):
-        voters_data = self.adapter.get_voters(booth_ids)
-        # Convert to Voter objects
-        voters = [Voter.from_dict(v) for v in voters_data]
-        return voters
+    async def search_voters(self, booth_ids):
+        # Row views over the fetched tuples; no per-voter dict or Voter copy
+        columns, rows = await self.async_adapter.get_voter_rows(booth_ids=booth_ids)
+        return VoterRow.from_rows(columns, rows)
+
+    async def get_voter_list_versions(self, booth_ids):
+        return await self.async_adapter.get_voter_list_versions(booth_ids)
+
+    def get_voters_etag(self, booth_ids, versions) -> str:
+        """ETag of the full voter list for booth_ids, from the voters' updated_at alone"""
+        return version_etag("voters", sorted(booth_ids or []), sorted(versions.items()))
+
+    async def serialize_voters(self, booth_ids, versions=None) -> bytes:
+        """Full voter list as VoterResponse JSON, assembled from per-booth cached bodies"""
+        if versions is None:
+            versions = await self.get_voter_list_versions(booth_ids)
+
+        booth_bodies = await asyncio.gather(*(
+            voter_list_cache.get(booth_id, version, lambda booth_id=booth_id: self._encode_booth_voters(booth_id))
+            for booth_id, version in sorted(versions.items())
+        ))
+        # Splice the per-booth arrays into one
+        return b"[" + b",".join(body[1:-1] for body in booth_bodies if len(body) > 2) + b"]"
+
+    async def _encode_booth_voters(self, booth_id) -> bytes:
+        """Encode one booth's voters straight from DB rows.
+
+        Rows come from our own voters table, so the per-row Voter / VoterResponse
+        round trip is skipped; the selected columns follow the schema field order.
+        """
+        fields = self.VOTER_RESPONSE_FIELDS
+        _, rows = await self.async_adapter.get_voter_rows(fields, [booth_id])
+        voters = [dict(zip(fields, row)) for row in rows]
+        for voter in voters:
+            # Voter.from_dict turns a missing feedback into {}
+            if not voter["feedback"]:
+                voter["feedback"] = {}
+        return dumps_json(voters)
+
+    def _decode_voter_cursor(self, cursor):
+        """Decode a (booth_id, serial_no_in_list, epic_id) keyset cursor, raising ValueError if malformed"""
+        after = decode_cursor(cursor)
+        if len(after) != 3 or not all(
+            isinstance(value, kind) and not isinstance(value, bool)
+            for value, kind in zip(after, (int, int, str))
+        ):
+            raise ValueError("Invalid cursor")
+        return after
+
+    async def get_voters_page(self, booth_ids, fields=None, cursor=None, limit=500):
+        """Get one page of voters (optionally projected) plus the cursor for the next page"""
+        after = self._decode_voter_cursor(cursor) if cursor else None
+
+        voters = await self.async_adapter.get_voters_page(booth_ids, fields, after, limit)
 
-    def get_voter_by_epic(self, epic_id):
-        voters_data = self.adapter.get_voters_by_epic(epic_id)
+        next_cursor = None
+        if len(voters) == limit:
+            last = voters[-1]
+            next_cursor = encode_cursor([last["booth_id"], last["serial_no_in_list"] or 0, last["epic_id"]])
+
+        return {"items": voters, "next_cursor": next_cursor}
+
+    async def filter_voters(self, booth_ids, filters, fields=None, cursor=None, limit=500):
+        """One page of voters matching every filter, the total match count and per-dimension facet counts"""
+        after = self._decode_voter_cursor(cursor) if cursor else None
+
+        unknown = set(filters) - set(self.async_adapter.VOTER_FACETS)
+        if unknown:
+            raise ValueError(f"Unknown filters: {', '.join(sorted(unknown))}")
+        unknown_bands = set(filters.get("age_band", [])) - set(self.async_adapter.VOTER_AGE_BANDS)
+        if unknown_bands:
+            raise ValueError(f"Unknown age bands: {', '.join(sorted(unknown_bands))}")
+
+        # An empty value list would match nothing; treat it as no filter
+        filters = {dimension: values for dimension, values in filters.items() if values}
+        voters, total, facets = await self.async_adapter.filter_voters(booth_ids, filters, fields, after, limit)
+
+        next_cursor = None
+        if len(voters) == limit:
+            last = voters[-1]
+            next_cursor = encode_cursor([last["booth_id"], last["serial_no_in_list"] or 0, last["epic_id"]])
+
+        return {"items": voters, "next_cursor": next_cursor, "total": total, "facets": facets}
+
+    async def find_voters(self, booth_ids, query, modes, limit=20, offset=0):
+        """Ranked page of voters matching a name, guardian name, house number or mobile"""
+        term = " ".join(query.lower().split())
+        if len(term) < 2:
+            raise ValueError("Search query must be at least 2 characters")
+
+        voters = await self.async_adapter.find_voters(booth_ids, term, modes, limit, offset)
+        return {
+            "items": voters[:limit],
+            "offset": offset,
+            "limit": limit,
+            "has_more": len(voters) > limit
+        }
+
+    async def get_voter_changes(self, booth_ids, since=None, limit=500, changed_only=False):
+        """Get voters changed after the since cursor plus the cursor to poll with next"""
+        after = None
+        if since:
+            values = decode_cursor(since)
+            if len(values) != 2 or not all(isinstance(value, str) for value in values):
+                raise ValueError("Invalid cursor")
+            try:
+                after = (datetime.fromisoformat(values[0]), values[1])
+            except (TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+
+        rows = await self.async_adapter.get_voter_changes(
+            booth_ids, after, limit, with_changed_fields=changed_only, settle_seconds=settings.CHANGE_FEED_SETTLE_SECONDS
+        )
+
+        items = []
+        for row in rows:
+            changed_fields = row.pop("changed_fields", None)
+            if changed_only:
+                # Unknown changes (no audit rows, or first sync) fall back to the full row
+                fields = [f for f in changed_fields if f in row] if changed_fields else [
+                    f for f in row if f not in ("epic_id", "booth_id", "updated_at")
+                ]
+                row = {
+                    "epic_id": row["epic_id"],
+                    "booth_id": row["booth_id"],
+                    "updated_at": row["updated_at"],
+                    "changes": {f: row[f] for f in fields}
+                }
+            items.append(row)
+
+        # With nothing new the client keeps polling from the same point
+        next_cursor = since
+        if rows:
+            next_cursor = encode_cursor([rows[-1]["updated_at"].isoformat(), rows[-1]["epic_id"]])
+
+        return {"items": items, "next_cursor": next_cursor, "has_more": len(rows) == limit}
+
+    def stream_voters_ndjson(self, booth_ids, fields=None):
+        """Get an async iterator of NDJSON chunks; fields are validated before streaming starts"""
+        self.async_adapter.validate_voter_fields(fields)
+        return self._iter_voters_ndjson(booth_ids, fields)
+
+    async def _iter_voters_ndjson(self, booth_ids, fields=None, chunk_size=500):
+        lines = []
+        async for voter in self.async_adapter.stream_voters(booth_ids, fields):
+            lines.append(dumps_json(voter))
+            if len(lines) >= chunk_size:
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+
+    async def get_voter_by_epic(self, epic_id):
+        voters_data = await self.async_adapter.get_voters_by_epic(epic_id)
         if voters_data:
             return Voter.from_dict(voters_data[0])
         return None
 
-    def update_voter(self, user, epic_id, changes):  
-        result = self.adapter.update_voter(epic_id, changes, user['user_id'])
-        if result:
-            voter_data = self.adapter.get_voters_by_epic(epic_id)[0]
-            booth_id = voter_data["booth_id"]
-            if booth_id:
-                self.booth_summary_service.update_booth_summary(booth_id)
-            logger.info(f"Updated voter {epic_id} and booth summary")
-        return result
+    async def update_voter(self, user, epic_id, changes):  
+        result = await self.async_adapter.update_voter(epic_id, changes, user['user_id'])
+        if not result:
+            return False
+
+        old_voter, new_voter = result
+        booth_id = new_voter["booth_id"]
+        voter_list_cache.invalidate({old_voter["booth_id"], booth_id})
+        if booth_id and set(changes) & BoothSummaryService.SUMMARY_FIELDS:
+            # Apply the old/new delta to the stored counters; fall back to a full recompute
+            # when the booth has no summary yet. Runs on the sync pool, so off the event loop.
+            applied = await asyncio.to_thread(
+                self.booth_summary_service.apply_voter_delta, booth_id, old_voter, new_voter
+            )
+            if not applied:
+                await asyncio.to_thread(self.booth_summary_service.update_booth_summary, booth_id)
+        logger.info(f"Updated voter {epic_id} and booth summary")
+        return True
+
+    async def sync_voters(self, user, edits):
+        """Replay offline edits in one transaction and refresh each touched booth summary once"""
+        # Edits to the same voter apply in device order; untimed edits keep request order
+        order = sorted(
+            range(len(edits)),
+            key=lambda i: edits[i]['client_timestamp'].timestamp() if edits[i].get('client_timestamp') else float('-inf')
+        )
+        allowed_booth_ids = set(user['assigned_booths'] or []) if user['role'] == 'booth_volunteer' else None
+
+        applied_results, changed_fields_by_booth = await self.async_adapter.sync_voters(
+            [edits[i] for i in order], user['user_id'], allowed_booth_ids
+        )
+        voter_list_cache.invalidate(changed_fields_by_booth)
+        # Report results in request order
+        results = [None] * len(edits)
+        for position, i in enumerate(order):
+            results[i] = applied_results[position]
+
+        refreshed_booths = sorted(
+            booth_id for booth_id, fields in changed_fields_by_booth.items()
+            if booth_id and fields & BoothSummaryService.SUMMARY_FIELDS
+        )
+        if refreshed_booths:
+            await asyncio.to_thread(self.booth_summary_service.refresh_all_summaries, refreshed_booths)
+
+        applied = sum(1 for result in results if result['status'] == 'applied')
+        conflicts = sum(1 for result in results if result['status'] == 'conflict')
+        logger.info(f"Synced {applied} voter edits ({conflicts} conflicts) for user {user['user_id']}")
+        return {
+            'applied': applied,
+            'conflicts': conflicts,
+            'results': results,
+            'booth_summaries_refreshed': refreshed_booths
+        }
 
     def get_booth_summaries(self, booth_ids):
         return self.booth_summary_service.get_booth_summaries(booth_ids)
 
-    def bulk_update_voters(self, user, field_updates, options=None):
+    def get_booth_summaries_etag(self, booth_ids) -> str:
+        version = self.booth_summary_service.get_summaries_version(booth_ids)
+        return version_etag("booth_summaries", sorted(booth_ids or []), *version)
+
+    async def bulk_update_voters(self, user, field_updates, options=None):
         """Bulk update voters with permission validation"""
         options = options or {}
         all_epic_ids = set()
-        updated_counts = {}
         
         # Collect all epic IDs to validate permissions
         for field, updates in field_updates.items():
             all_epic_ids.update(updates.keys())
         
         # Get booth IDs for permission check
-        affected_booth_ids = self.adapter.get_affected_booth_ids(list(all_epic_ids))
+        affected_booth_ids = await self.async_adapter.get_affected_booth_ids(list(all_epic_ids))
         
         # Validate user has access to all affected booths
         if user['role'] == 'booth_volunteer':
@@ -52,17 +257,22 @@ class VoterService:
             if unauthorized_booths:
                 raise ValueError(f"Access denied to booths: {unauthorized_booths}")
         
-        # Perform bulk updates for each field
+        # Regroup per voter so every field lands in one row rewrite
+        voter_updates = {}
         for field, updates in field_updates.items():
-            if updates:  # Skip empty updates
-                count = self.adapter.bulk_update_voters_by_field(field, updates, user['user_id'])
-                updated_counts[field] = count
-                logger.info(f"Bulk updated {count} voters for field '{field}'")
+            for epic_id, value in (updates or {}).items():
+                voter_updates.setdefault(epic_id, {})[field] = value
+
+        counts = await self.async_adapter.bulk_update_voters(voter_updates, user['user_id'])
+        voter_list_cache.invalidate(affected_booth_ids)
+        updated_counts = {field: counts.get(field, 0) for field, updates in field_updates.items() if updates}
+        for field, count in updated_counts.items():
+            logger.info(f"Bulk updated {count} voters for field '{field}'")
         
         # Refresh booth summaries if requested
         refreshed_booths = []
         if options.get('refresh_booth_summaries', True):
-            self.booth_summary_service.refresh_all_summaries(affected_booth_ids)
+            await asyncio.to_thread(self.booth_summary_service.refresh_all_summaries, affected_booth_ids)
             refreshed_booths = affected_booth_ids
         
         return {
@@ -71,6 +281,9 @@ class VoterService:
             'booth_summaries_refreshed': refreshed_booths
         }
 
-    def refresh_booth_summaries(self, booth_ids = None):
-        """Refresh all booth summaries"""
-        self.booth_summary_service.refresh_all_summaries(booth_ids)
+    def refresh_booth_summaries(self, booth_ids = None, requested_by = None):
+        """Queue a background refresh of booth summaries and return the job"""
+        return summary_refresh_jobs.submit(booth_ids, requested_by)
+
+    def get_refresh_job(self, job_id, user_id = None, assigned_booths = None):
+        return summary_refresh_jobs.get_job(job_id, user_id, assigned_booths)
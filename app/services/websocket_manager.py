@@ -1,55 +1,166 @@
-from typing import Dict, List
+from collections import OrderedDict
+from datetime import datetime
+from itertools import count
+from typing import Dict, Hashable, Iterable, Optional, Set
 from fastapi import WebSocket
 import json
 import asyncio
+from app.core.config import settings
+from app.utils.helpers import json_default
 from app.utils.logger import logger
 
+# location_batch coordinates are integer micro-degrees (~0.1 m)
+COORDINATE_SCALE = 1_000_000
+
+def _scaled(location: dict) -> tuple:
+    return round(location["latitude"] * COORDINATE_SCALE), round(location["longitude"] * COORDINATE_SCALE)
+
+class ConnectionSender:
+    """Bounded outgoing queue for one WebSocket, drained by its own sender task.
+
+    Messages sharing a key (e.g. the location of one subordinate) are coalesced:
+    a newer one replaces the queued one in place, so a slow reader only ever
+    gets the latest state. Once max_pending distinct messages are waiting the
+    consumer is considered too slow.
+    """
+
+    def __init__(self, websocket: WebSocket, max_pending: int, send_timeout: float):
+        self.websocket = websocket
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+        self.coalesced = 0
+        self._pending: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._sequence = count()
+        self._wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        # Last coordinates sent per subordinate, the base for location_batch deltas
+        self.sent_positions: Dict[int, tuple] = {}
+
+    def start(self, on_failure):
+        self.task = asyncio.create_task(self._run(on_failure))
+
+    def enqueue(self, text: str, key: Optional[Hashable] = None) -> bool:
+        """Queue text without blocking; False when the consumer has fallen too far behind"""
+        if key is not None and key in self._pending:
+            self._pending[key] = text
+            self.coalesced += 1
+            return True
+        if len(self._pending) >= self.max_pending:
+            return False
+        self._pending[key if key is not None else ("message", next(self._sequence))] = text
+        self._wakeup.set()
+        return True
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def stop(self):
+        if self.task and not self.task.done() and self.task is not asyncio.current_task():
+            self.task.cancel()
+
+    async def _run(self, on_failure):
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while self._pending:
+                    _, text = self._pending.popitem(last=False)
+                    await asyncio.wait_for(self.websocket.send_text(text), self.send_timeout)
+        except Exception as e:
+            on_failure(e)
+
 class LocationWebSocketManager:
-    def __init__(self):
+    def __init__(
+        self,
+        max_pending: int = settings.WEBSOCKET_SEND_QUEUE_SIZE,
+        send_timeout: float = settings.WEBSOCKET_SEND_TIMEOUT,
+        tick_seconds: float = settings.LOCATION_BROADCAST_TICK_SECONDS
+    ):
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+        self.tick_seconds = tick_seconds
         self.active_connections: Dict[int, WebSocket] = {}
-        self.user_permissions: Dict[int, List[int]] = {}
+        self.user_permissions: Dict[int, Set[int]] = {}
+        # Reverse of user_permissions: subordinate -> supervisors watching them
+        self.supervisors_by_user: Dict[int, Set[int]] = {}
+        self._senders: Dict[int, ConnectionSender] = {}
+        self.dropped_connections = 0
+        # Latest location of every user pinged since the last tick
+        self._dirty_locations: Dict[int, dict] = {}
+        self._tick_task: Optional[asyncio.Task] = None
+        self.batch_frames_sent = 0
+        self.batched_updates = 0
 
-    async def connect(self, websocket: WebSocket, user_id: int, subordinate_ids: List[int]):
+    async def connect(self, websocket: WebSocket, user_id: int, subordinate_ids: Iterable[int]):
         """Accept WebSocket connection and store user permissions"""
         await websocket.accept()
+        # A new connection replaces the user's previous one
+        self.disconnect(user_id)
+
+        sender = ConnectionSender(websocket, self.max_pending, self.send_timeout)
+        sender.start(lambda e: self._on_send_failure(user_id, websocket, e))
         self.active_connections[user_id] = websocket
-        self.user_permissions[user_id] = subordinate_ids
+        self._senders[user_id] = sender
+        self.user_permissions[user_id] = set(subordinate_ids)
+        for subordinate_id in self.user_permissions[user_id]:
+            self.supervisors_by_user.setdefault(subordinate_id, set()).add(user_id)
         logger.info(f"WebSocket connected for user {user_id}")
 
-    def disconnect(self, user_id: int):
-        """Remove WebSocket connection"""
-        self.active_connections.pop(user_id, None)
-        self.user_permissions.pop(user_id, None)
+    def disconnect(self, user_id: int, websocket: Optional[WebSocket] = None):
+        """Remove WebSocket connection; with websocket, only if it is still the user's current one"""
+        if websocket is not None and self.active_connections.get(user_id) is not websocket:
+            return
+        if self.active_connections.pop(user_id, None) is None:
+            return
+
+        self._senders.pop(user_id).stop()
+        for subordinate_id in self.user_permissions.pop(user_id, ()):
+            supervisors = self.supervisors_by_user.get(subordinate_id)
+            if supervisors is not None:
+                supervisors.discard(user_id)
+                if not supervisors:
+                    del self.supervisors_by_user[subordinate_id]
         logger.info(f"WebSocket disconnected for user {user_id}")
 
     async def send_personal_message(self, message: dict, user_id: int):
         """Send message to specific user"""
-        websocket = self.active_connections.get(user_id)
-        if websocket:
+        self._send(user_id, self._serialize(message))
+
+    def send_text(self, user_id: int, text: str, websocket: Optional[WebSocket] = None):
+        """Queue a raw text frame, e.g. a pong, behind the user's other messages; with websocket, only if it is still the user's current one"""
+        if websocket is not None and self.active_connections.get(user_id) is not websocket:
+            return
+        self._send(user_id, text)
+
+    def start_broadcasting(self):
+        """Start the tick that sends location_batch frames (LOCATION_BROADCAST_TICK_SECONDS=0 sends every ping at once)"""
+        if self.tick_seconds > 0 and not self._tick_task:
+            self._tick_task = asyncio.create_task(self._tick())
+
+    async def stop_broadcasting(self):
+        if self._tick_task:
+            self._tick_task.cancel()
             try:
-                await websocket.send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Failed to send message to user {user_id}: {e}")
-                self.disconnect(user_id)
+                await self._tick_task
+            except asyncio.CancelledError:
+                pass
+            self._tick_task = None
 
     async def broadcast_location_update(self, updated_user_id: int, location_data: dict):
-        """Broadcast location update to authorized supervisors"""
+        """Broadcast location update to authorized supervisors, batched per tick when the scheduler runs"""
+        if self._tick_task:
+            if updated_user_id in self.supervisors_by_user:
+                self._dirty_locations[updated_user_id] = location_data
+            return
+
         message = {
             "type": "location_update",
             "user_id": updated_user_id,
             "data": location_data,
             "timestamp": location_data.get("last_updated").isoformat() if location_data.get("last_updated") else None
         }
-
-        # Find all supervisors who can see this user
-        authorized_supervisors = []
-        for supervisor_id, subordinate_ids in self.user_permissions.items():
-            if updated_user_id in subordinate_ids:
-                authorized_supervisors.append(supervisor_id)
-
-        # Send to all authorized supervisors
-        for supervisor_id in authorized_supervisors:
-            await self.send_personal_message(message, supervisor_id)
+        self._broadcast(updated_user_id, message, ("location", updated_user_id))
 
     async def send_initial_locations(self, user_id: int, locations_data: Dict[int, dict]):
         """Send initial location data when user connects"""
@@ -57,6 +168,10 @@ class LocationWebSocketManager:
             "type": "initial_locations",
             "data": locations_data
         }
+        sender = self._senders.get(user_id)
+        if sender:
+            # Later location_batch deltas build on what the client got here
+            sender.sent_positions.update((subordinate_id, _scaled(location)) for subordinate_id, location in locations_data.items())
         await self.send_personal_message(message, user_id)
 
     async def broadcast_user_status(self, user_id: int, is_online: bool):
@@ -67,11 +182,105 @@ class LocationWebSocketManager:
             "is_online": is_online,
             "timestamp": None
         }
+        self._broadcast(user_id, message, ("status", user_id))
+
+    def get_stats(self) -> Dict:
+        return {
+            "connections": len(self.active_connections),
+            "watched_users": len(self.supervisors_by_user),
+            "queued_messages": sum(sender.pending for sender in self._senders.values()),
+            "coalesced_messages": sum(sender.coalesced for sender in self._senders.values()),
+            "dropped_connections": self.dropped_connections,
+            "tick_seconds": self.tick_seconds if self._tick_task else 0,
+            "pending_locations": len(self._dirty_locations),
+            "batch_frames_sent": self.batch_frames_sent,
+            "batched_updates": self.batched_updates
+        }
+
+    async def _tick(self):
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            try:
+                self.flush_location_batches()
+            except Exception as e:
+                logger.error(f"Location broadcast tick failed: {e}")
+
+    def flush_location_batches(self):
+        """Send each supervisor one location_batch frame covering its subordinates pinged since the last tick.
+
+        Positions are integer micro-degrees: "lat"/"lon" the first time a
+        subordinate is sent on a connection, "dlat"/"dlon" relative to the
+        previous frame (or initial_locations) afterwards. Pings that did not
+        move are left out.
+        """
+        dirty, self._dirty_locations = self._dirty_locations, {}
+        updates_by_supervisor: Dict[int, list] = {}
+        for user_id in dirty:
+            for supervisor_id in self.supervisors_by_user.get(user_id, ()):
+                updates_by_supervisor.setdefault(supervisor_id, []).append(user_id)
+
+        timestamp = datetime.now().isoformat()
+        for supervisor_id, user_ids in updates_by_supervisor.items():
+            sender = self._senders.get(supervisor_id)
+            if not sender:
+                continue
+            updates = []
+            for user_id in user_ids:
+                location = dirty[user_id]
+                position = _scaled(location)
+                previous = sender.sent_positions.get(user_id)
+                if previous == position:
+                    continue
+                if previous is None:
+                    update = {"user_id": user_id, "lat": position[0], "lon": position[1]}
+                else:
+                    update = {"user_id": user_id, "dlat": position[0] - previous[0], "dlon": position[1] - previous[1]}
+                if location.get("accuracy") is not None:
+                    update["accuracy"] = location["accuracy"]
+                updates.append(update)
+                sender.sent_positions[user_id] = position
+            if updates:
+                self.batch_frames_sent += 1
+                self.batched_updates += len(updates)
+                self._send(supervisor_id, self._serialize({
+                    "type": "location_batch",
+                    "timestamp": timestamp,
+                    "scale": COORDINATE_SCALE,
+                    "updates": updates
+                }))
+
+    def _broadcast(self, subject_user_id: int, message: dict, key: Hashable):
+        """Queue one serialized copy of message for every supervisor of subject_user_id; never waits on a socket"""
+        supervisors = self.supervisors_by_user.get(subject_user_id)
+        if not supervisors:
+            return
+        text = self._serialize(message)
+        for supervisor_id in list(supervisors):
+            self._send(supervisor_id, text, key)
+
+    def _send(self, user_id: int, text: str, key: Optional[Hashable] = None):
+        sender = self._senders.get(user_id)
+        if sender and not sender.enqueue(text, key):
+            logger.warning(f"Dropping slow WebSocket consumer {user_id} ({sender.pending} messages queued)")
+            self.dropped_connections += 1
+            self._close(user_id, sender.websocket, code=1013, reason="Too slow to receive updates")
+
+    def _serialize(self, message: dict) -> str:
+        return json.dumps(message, default=json_default)
+
+    def _on_send_failure(self, user_id: int, websocket: WebSocket, error: Exception):
+        logger.error(f"Failed to send message to user {user_id}: {error!r}")
+        self._close(user_id, websocket, code=1011, reason="Send failed")
+
+    def _close(self, user_id: int, websocket: WebSocket, code: int, reason: str):
+        self.disconnect(user_id, websocket)
+        asyncio.create_task(self._close_quietly(websocket, code, reason))
 
-        # Find supervisors who can see this user
-        for supervisor_id, subordinate_ids in self.user_permissions.items():
-            if user_id in subordinate_ids:
-                await self.send_personal_message(message, supervisor_id)
+    async def _close_quietly(self, websocket: WebSocket, code: int, reason: str):
+        try:
+            await websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
 
 # Global WebSocket manager instance
-websocket_manager = LocationWebSocketManager()
\ No newline at end of file
+websocket_manager = LocationWebSocketManager()
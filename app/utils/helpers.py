@@ -0,0 +1,82 @@
+import base64
+import hashlib
+import json
+import orjson
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+from fastapi import Request, Response
+
+def json_default(value):
+    """json.dumps fallback for values read straight from Postgres rows"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps_json(value) -> bytes:
+    """Fast UTF-8 JSON encoding (orjson) with json_default as the fallback"""
+    return orjson.dumps(value, default=json_default)
+
+def encode_cursor(values: list) -> str:
+    """Encode keyset values into an opaque URL-safe pagination cursor"""
+    raw = json.dumps(values, default=json_default, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> list:
+    """Decode a cursor produced by encode_cursor, raising ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag for a serialized response body"""
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+def version_etag(*parts) -> str:
+    """Strong ETag derived from a data version (e.g. max updated_at) instead of the body"""
+    return make_etag(json.dumps(parts, default=json_default, separators=(",", ":")).encode())
+
+# CompressionMiddleware tags compressed representations as "<etag>-br" / "<etag>-gzip"
+ETAG_ENCODING_SUFFIXES = ("-br", "-gzip")
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    if etag.endswith('"'):
+        return f'{etag[:-1]}-{encoding}"'
+    return etag
+
+def _identity_etag(tag: str) -> str:
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in ETAG_ENCODING_SUFFIXES:
+        if tag.endswith(suffix + '"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names etag (in any content coding)"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or etag in [_identity_etag(tag) for tag in candidates]
+
+def etag_headers(etag: str) -> dict:
+    # no-cache: clients may store the body but must revalidate before reusing it
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+def etag_response(request: Request, body: bytes, etag: str, media_type: str = "application/json") -> Response:
+    """Serve body with its ETag, or an empty 304 when the client already has it"""
+    headers = etag_headers(etag)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
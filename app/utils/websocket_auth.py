@@ -3,6 +3,7 @@ from jose import JWTError, jwt
 from app.data.postgres_adapter import PostgresAdapter
 from typing import Optional
 from app.core.config import settings
+from app.services.user_hierarchy import user_hierarchy
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
@@ -47,18 +48,6 @@ async def authenticate_websocket(websocket: WebSocket) -> Optional[dict]:
         await websocket.close(code=status.WS_1011_INTERNAL_ERROR, reason="Authentication error")
         return None
 
-def get_subordinate_user_ids(user: dict) -> list:
-    """Get list of user IDs that the authenticated user can monitor"""
-    adapter = PostgresAdapter()
-    
-    if user['role'] == 'super_admin':
-        # Super admin can see all users
-        users = adapter.get_users()
-        return [u['user_id'] for u in users if u['is_active']]
-    elif user['role'] == 'admin':
-        # Admin can see users they created
-        users = adapter.get_users()
-        return [u['user_id'] for u in users if u['created_by'] == user['user_id'] and u['is_active']]
-    else:
-        # Booth boys and candidates can't monitor others
-        return []
\ No newline at end of file
+def get_subordinate_user_ids(user: dict) -> set:
+    """Get IDs of the users that the authenticated user can monitor"""
+    return user_hierarchy.get_subordinate_ids(user)
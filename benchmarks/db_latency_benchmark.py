@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Sync vs async data layer latency benchmark
+
+Issues the same queries from asyncio tasks at a fixed arrival rate, once
+through the blocking PostgresAdapter (as the routes used to call it) and once
+through AsyncPostgresAdapter, and reports p50/p95/p99 latency per path.
+
+Usage:
+    python benchmarks/db_latency_benchmark.py --username admin --booth-id 1 --rate 100 --total 2000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.data.postgres_adapter import PostgresAdapter
+from app.data.async_postgres_adapter import AsyncPostgresAdapter
+from app.data.async_connection import open_async_db_connections, close_async_db_connections
+from app.data.connection import close_db_connections
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def run_load(args, handle_request):
+    """Fire requests at a fixed arrival rate; latency includes time spent queued behind the loop"""
+    latencies = []
+
+    async def one_request(arrival):
+        await handle_request()
+        latencies.append((time.perf_counter() - arrival) * 1000)
+
+    tasks = []
+    start = time.perf_counter()
+    for i in range(args.total):
+        arrival = start + i / args.rate
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one_request(arrival)))
+    await asyncio.gather(*tasks)
+    return latencies
+
+async def run_sync_path(args):
+    adapter = PostgresAdapter()
+
+    async def handle_request():
+        # Blocking calls on the event loop, exactly like the old routes
+        adapter.get_user_by_username(args.username)
+        adapter.get_voters([args.booth_id])
+
+    return await run_load(args, handle_request)
+
+async def run_async_path(args):
+    adapter = AsyncPostgresAdapter()
+
+    async def handle_request():
+        await adapter.get_user_by_username(args.username)
+        await adapter.get_voters([args.booth_id])
+
+    return await run_load(args, handle_request)
+
+def report(name, latencies, elapsed):
+    print(f"{name:<6} requests={len(latencies):<6} elapsed={elapsed:8.2f}s "
+          f"p50={percentile(latencies, 50):8.1f}ms p95={percentile(latencies, 95):8.1f}ms "
+          f"p99={percentile(latencies, 99):8.1f}ms")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare sync and async data layer latency")
+    parser.add_argument("--username", required=True, help="Existing username to look up")
+    parser.add_argument("--booth-id", type=int, required=True, help="Booth ID whose voters are fetched")
+    parser.add_argument("--rate", type=float, default=100, help="Requests per second")
+    parser.add_argument("--total", type=int, default=2000, help="Total requests per path")
+    args = parser.parse_args()
+
+    await open_async_db_connections()
+    try:
+        for name, runner in (("sync", run_sync_path), ("async", run_async_path)):
+            start = time.perf_counter()
+            latencies = await runner(args)
+            report(name, latencies, time.perf_counter() - start)
+    finally:
+        await close_async_db_connections()
+        close_db_connections()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Voter list serialization benchmark
+
+Encodes the same booth's voters the way GET /voters/booth/{booth_id} used to
+(dict per row -> Voter.from_dict -> VoterResponse validation -> json) and the
+trusted path (row tuples -> orjson), checks both bodies decode to the same
+data, and reports the per-row cost of each. Rows are fetched once and repeated
+up to --rows so booth size does not depend on the local data.
+
+Usage:
+    python benchmarks/voter_serialization_benchmark.py --booth-id 1 --rows 5000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from app.data.async_postgres_adapter import AsyncPostgresAdapter
+from app.data.async_connection import open_async_db_connections, close_async_db_connections
+from app.models.voter import Voter
+from app.schemas.voter_schema import VoterResponse
+from app.services.voter_service import VoterService
+from app.utils.helpers import dumps_json
+
+async def encode_validated(columns, rows):
+    """What FastAPI does for response_model=List[VoterResponse]"""
+    field = create_response_field(name="Response_list_voters", type_=List[VoterResponse])
+    voters = [Voter.from_dict(dict(zip(columns, row))) for row in rows]
+    content = await serialize_response(field=field, response_content=voters)
+    return JSONResponse(content).body
+
+async def encode_trusted(columns, rows):
+    """VoterService._encode_booth_voters without the DB fetch"""
+    voters = [dict(zip(columns, row)) for row in rows]
+    for voter in voters:
+        if not voter["feedback"]:
+            voter["feedback"] = {}
+    return dumps_json(voters)
+
+async def best_of(repeat, encode, columns, rows):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = await encode(columns, rows)
+        timings.append(time.perf_counter() - start)
+    return min(timings), body
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare validated and trusted voter list serialization")
+    parser.add_argument("--booth-id", type=int, required=True, help="Booth ID whose voters are encoded")
+    parser.add_argument("--rows", type=int, default=5000, help="Voters per encoded list")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per path; the best run is reported")
+    args = parser.parse_args()
+
+    await open_async_db_connections()
+    try:
+        columns = VoterService.VOTER_RESPONSE_FIELDS
+        _, rows = await AsyncPostgresAdapter().get_voter_rows(columns, [args.booth_id])
+    finally:
+        await close_async_db_connections()
+
+    if not rows:
+        sys.exit(f"Booth {args.booth_id} has no voters")
+    rows = (rows * (args.rows // len(rows) + 1))[:args.rows]
+
+    results = {}
+    for name, encode in (("validated", encode_validated), ("trusted", encode_trusted)):
+        elapsed, body = await best_of(args.repeat, encode, columns, rows)
+        results[name] = (elapsed, body)
+        print(f"{name:<10} rows={len(rows):<6} total={elapsed * 1000:8.1f}ms "
+              f"per_row={elapsed * 1e6 / len(rows):7.2f}us body={len(body) / 1024:8.1f}KiB")
+
+    same = json.loads(results["validated"][1]) == json.loads(results["trusted"][1])
+    print(f"speedup={results['validated'][0] / results['trusted'][0]:.1f}x identical_output={same}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,6 +4,9 @@
 -- Enable UUID extension for better primary keys
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Trigram matching for voter search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- =============================================
 -- CORE ADMINISTRATIVE TABLES
 -- =============================================
@@ -475,6 +478,62 @@ CREATE INDEX idx_voters_booth_preference ON voters(booth_id, voting_preference);
 CREATE INDEX idx_voters_constituency_gender ON voters(constituency_id, gender);
 CREATE INDEX idx_voters_booth_age_gender ON voters(booth_id, age, gender);
 
+-- Keyset pagination order for voter listings
+CREATE INDEX idx_voters_keyset ON voters(booth_id, COALESCE(serial_no_in_list, 0), epic_id);
+CREATE INDEX idx_voters_booth_updated ON voters(booth_id, updated_at, epic_id);
+
+-- =============================================
+-- VOTER SEARCH (GET /voters/search)
+-- =============================================
+
+-- Lower-cased names (English and Hindi), guardian names, house number and mobile in one string
+CREATE OR REPLACE FUNCTION voter_search_document(VARIADIC fields TEXT[])
+RETURNS TEXT AS $$
+    SELECT lower(array_to_string(fields, ' '))
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+
+-- Phonetic key of one romanized name: aspirates (bh, ch, dh, kh, sh, th...) lose the h,
+-- w/v, z/j, q/k and x/k merge, vowels after the first letter are dropped and repeats
+-- collapse, so Chaudhary, Choudhary and Chowdhury all become "cdr".
+-- Kept to a single expression so callers can inline it
+CREATE OR REPLACE FUNCTION voter_phonetic_key(word TEXT)
+RETURNS TEXT AS $$
+    SELECT NULLIF(regexp_replace(regexp_replace(regexp_replace(
+        translate(
+            regexp_replace(regexp_replace(lower(word), '[^a-z]', '', 'g'), '([bcdgjkpst])h', '\1', 'g'),
+            'zqxw', 'jkkv'
+        ),
+        '^[eiou]', 'a'), '(?<=.)[aeiouyhvw]', '', 'g'), '(.)\1+', '\1', 'g'), '')
+$$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
+
+-- Distinct phonetic keys of every word in the given names (NULL when none are romanized)
+CREATE OR REPLACE FUNCTION voter_phonetic_keys(VARIADIC names TEXT[])
+RETURNS TEXT[] AS $$
+DECLARE
+    keys TEXT[] := '{}';
+    word TEXT;
+    key TEXT;
+BEGIN
+    FOREACH word IN ARRAY regexp_split_to_array(array_to_string(names, ' '), '\s+') LOOP
+        key := voter_phonetic_key(word);
+        IF key IS NOT NULL AND NOT key = ANY(keys) THEN
+            keys := keys || key;
+        END IF;
+    END LOOP;
+    RETURN NULLIF(keys, '{}');
+END;
+$$ LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE;
+
+-- Expressions must match AsyncPostgresAdapter.VOTER_SEARCH_DOCUMENT / VOTER_PHONETIC_KEYS
+CREATE INDEX idx_voters_search_trgm ON voters USING gin (
+    voter_search_document(voter_fname, voter_lname, voter_fname_hin, voter_lname_hin,
+                          guardian_fname, guardian_lname, guardian_fname_hin, guardian_lname_hin,
+                          house_no, mobile) gin_trgm_ops
+);
+CREATE INDEX idx_voters_phonetic ON voters USING gin (
+    voter_phonetic_keys(voter_fname, voter_lname, guardian_fname, guardian_lname)
+);
+
 -- =============================================
 -- TRIGGERS FOR AUTO-UPDATES
 -- =============================================